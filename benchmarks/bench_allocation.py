@@ -0,0 +1,93 @@
+"""Benchmark the allocation core against the heater count.
+
+Run with ``python benchmarks/bench_allocation.py``. The allocation module has
+no Home Assistant imports and is loaded straight from its file, so the
+benchmark also runs without a Home Assistant installation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+from pathlib import Path
+import random
+import timeit
+
+MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "custom_components"
+    / "ha_heat_calculator"
+    / "allocation.py"
+)
+HEATER_COUNTS = (5, 50, 500, 5000)
+# The coordinator keeps these period counters and prices every round.
+PERIOD_COUNTERS = ("daily", "monthly", "yearly")
+GAS_PRICE = 1.2
+
+
+def _load_allocation():
+    """Import the allocation module without importing the integration package."""
+    spec = importlib.util.spec_from_file_location("heat_calculator_allocation", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _dict_baseline(heaters: int):
+    """Return a distribution round shaped like the former dict-of-dataclass loop."""
+    effort = {f"climate.heater_{index}": random.random() for index in range(heaters)}
+    weights = {entity_id: random.uniform(5, 30) for entity_id in effort}
+    totals = dict.fromkeys(effort, 0.0)
+
+    def run() -> None:
+        weighted = {entity_id: value * weights[entity_id] for entity_id, value in effort.items()}
+        total_effort = sum(weighted.values())
+        for entity_id, value in weighted.items():
+            totals[entity_id] += 1.0 * value / total_effort
+
+    return run
+
+
+def _core_round(allocation, heaters: int, use_numpy: bool):
+    """Return a distribution round on an allocation core set up like the coordinator's."""
+    core = allocation.AllocationCore(
+        [f"climate.heater_{index}" for index in range(heaters)],
+        PERIOD_COUNTERS,
+        use_numpy=use_numpy,
+    )
+    core.set_weights(random.uniform(5, 30) for _ in range(heaters))
+    effort = [random.random() for _ in range(heaters)]
+
+    def run() -> None:
+        core.distribute(1.0, effort, GAS_PRICE)
+
+    return run
+
+
+def main() -> None:
+    """Print the mean time per distribution round for each heater count."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    allocation = _load_allocation()
+    variants = {"dict loop": None, "array": False}
+    if allocation.np is not None:
+        variants["numpy"] = True
+
+    print(f"{'heaters':>8} " + " ".join(f"{name:>12}" for name in variants))
+    for heaters in HEATER_COUNTS:
+        timings = []
+        for use_numpy in variants.values():
+            if use_numpy is None:
+                run = _dict_baseline(heaters)
+            else:
+                run = _core_round(allocation, heaters, use_numpy)
+            best = min(timeit.repeat(run, repeat=args.repeat, number=args.number))
+            timings.append(best / args.number * 1e6)
+        print(f"{heaters:>8} " + " ".join(f"{value:>10.1f}us" for value in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Benchmark the coordinator hot path against the heater count.
+
+Run with ``python benchmarks/bench_coordinator.py`` from a Home Assistant
+development environment. Heater and gas meter states come from a minimal
+stand-in for ``hass.states``, so no integrations, recorder or event bus
+traffic are involved and runs are reproducible.
+
+For every heater count the benchmark reports the median latency per call,
+the net number of memory blocks allocated per call and the peak traced
+memory of one call. ``--save`` writes the results as JSON and ``--baseline``
+compares a run with such a file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+import json
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from harness import GAS_METER, StateTable, create_entry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ha_heat_calculator import number, select, sensor, switch
+from custom_components.ha_heat_calculator.const import DOMAIN
+from custom_components.ha_heat_calculator.coordinator import HeatCalculatorCoordinator
+
+HEATER_COUNTS = (5, 50, 500, 5000)
+PLATFORMS = (sensor, number, select, switch)
+
+
+def _heater_attributes(index: int) -> dict[str, Any]:
+    """Return climate attributes with every third heater idle."""
+    if index % 3 == 0:
+        return {"hvac_action": "idle", "current_temperature": 21, "temperature": 21}
+    return {
+        "hvac_action": "heating",
+        "current_temperature": 17 + index % 4,
+        "temperature": 21,
+    }
+
+
+async def _measure(
+    call: Callable[[], Awaitable[Any] | Any], number: int
+) -> dict[str, float]:
+    """Return latency, net allocated blocks and peak memory of a call."""
+
+    async def run() -> None:
+        result = call()
+        if asyncio.iscoroutine(result):
+            await result
+
+    await run()
+    latencies = []
+    for _ in range(number):
+        start = time.perf_counter()
+        await run()
+        latencies.append(time.perf_counter() - start)
+
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(number):
+        await run()
+    blocks = (sys.getallocatedblocks() - blocks_before) / number
+
+    tracemalloc.start()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "latency_us": statistics.median(latencies) * 1e6,
+        "blocks": blocks,
+        "peak_kib": peak / 1024,
+    }
+
+
+async def _bench_heaters(
+    hass: HomeAssistant, states: StateTable, heaters: int, number: int
+) -> dict[str, dict[str, float]]:
+    """Measure all hot path operations for one heater count."""
+    heater_ids = [f"climate.heater_{index}" for index in range(heaters)]
+    for index, entity_id in enumerate(heater_ids):
+        states.set(entity_id, "heat", _heater_attributes(index))
+    gas = [1000.0]
+    states.set(GAS_METER, str(gas[0]), {"unit_of_measurement": "m³"})
+
+    entry = create_entry(heater_ids)
+    coordinator = HeatCalculatorCoordinator(hass, entry)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    await coordinator._async_update_data()
+
+    def next_reading() -> None:
+        gas[0] += 0.01
+        states.set(GAS_METER, f"{gas[0]:.3f}", {"unit_of_measurement": "m³"})
+
+    async def update_data() -> None:
+        next_reading()
+        await coordinator._async_update_data()
+
+    clock = [dt_util.utcnow()]
+
+    def add_heating_effort() -> None:
+        clock[0] += timedelta(seconds=30)
+        coordinator._add_heating_effort(clock[0])
+
+    def distribute_gas() -> None:
+        coordinator._distribute_gas(0.01, clock[0] - timedelta(minutes=5), clock[0])
+
+    entities: list[Any] = []
+
+    async def platform_setup() -> None:
+        entities.clear()
+        for platform in PLATFORMS:
+            await platform.async_setup_entry(hass, entry, entities.extend)
+
+    await platform_setup()
+    sensors = [entity for entity in entities if isinstance(entity, sensor.SensorEntity)]
+
+    def attribute_generation() -> None:
+        coordinator.config_version += 1
+        for entity in sensors:
+            entity.native_value  # noqa: B018
+            entity.extra_state_attributes  # noqa: B018
+
+    results = {
+        "_async_update_data": await _measure(update_data, number),
+        "_add_heating_effort": await _measure(add_heating_effort, number),
+        "_distribute_gas": await _measure(distribute_gas, number),
+        "attributes": await _measure(attribute_generation, number),
+        "platform_setup": await _measure(platform_setup, max(1, number // 10)),
+    }
+
+    await coordinator.async_shutdown()
+    hass.data[DOMAIN].pop(entry.entry_id)
+    return results
+
+
+def _print_results(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]] | None,
+) -> None:
+    """Print one table row per heater count and operation."""
+    print(
+        f"{'heaters':>8} {'operation':<20} {'latency':>12} {'blocks':>9} {'peak':>11}"
+        + ("  vs baseline" if baseline else "")
+    )
+    for heaters, operations in results.items():
+        for operation, values in operations.items():
+            row = (
+                f"{heaters:>8} {operation:<20} {values['latency_us']:>10.1f}us"
+                f" {values['blocks']:>9.1f} {values['peak_kib']:>8.1f}KiB"
+            )
+            reference = (baseline or {}).get(heaters, {}).get(operation)
+            if reference and reference["latency_us"] > 0:
+                row += f"  {values['latency_us'] / reference['latency_us']:>10.2f}x"
+            print(row)
+
+
+async def _async_main(args: argparse.Namespace) -> dict[str, dict[str, dict[str, float]]]:
+    """Run the benchmark for every heater count."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.states = StateTable()
+        results = {}
+        for heaters in args.heaters:
+            results[str(heaters)] = await _bench_heaters(
+                hass, hass.states, heaters, args.number
+            )
+        await hass.async_stop(force=True)
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print or store the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50)
+    parser.add_argument("--heaters", type=int, nargs="+", default=HEATER_COUNTS)
+    parser.add_argument("--save", type=Path, help="write the results to a JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare with a saved JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(_async_main(args))
+    baseline = None if args.baseline is None else json.loads(args.baseline.read_text())
+    _print_results(results, baseline)
+    if args.save is not None:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Measure config entry setup time against the heater count.
+
+Run with ``python benchmarks/bench_setup.py`` from a Home Assistant
+development environment. Home Assistant is started with empty registries in a
+temporary configuration directory, without recorder or other integrations.
+
+Every heater count is set up twice: once with new entities, like after
+adding the integration, and once more after unloading with the last states
+of all entities available for restoring, like after a restart. The second
+setup restores the heater outputs from their number entities. The time of
+``async_setup`` of the config entry includes the first refresh and all
+platforms. Options written during setup are reported as well and should be
+zero.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from harness import GAS_METER, create_entry
+from homeassistant import bootstrap, loader
+from homeassistant.config_entries import ConfigEntries
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CoreState, HomeAssistant, State
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity,
+    entity_registry as er,
+    restore_state as rs,
+    translation,
+)
+from homeassistant.util import dt as dt_util
+
+HEATER_COUNTS = (5, 50, 500)
+
+
+async def _async_start(config_dir: str) -> HomeAssistant:
+    """Return a running Home Assistant instance with loaded registries."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    await hass.config.async_set_time_zone("UTC")
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, hass.config_entries._async_shutdown)
+    entity.async_setup(hass)
+    loader.async_setup(hass)
+    translation.async_setup(hass)
+    await ar.async_load(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    await rs.async_load(hass)
+    hass.data[bootstrap.DATA_REGISTRIES_LOADED] = None
+    hass.set_state(CoreState.running)
+    return hass
+
+
+def _restore_last_states(hass: HomeAssistant, entry_id: str) -> None:
+    """Offer the current states of all entities of an entry for restoring."""
+    last_states = rs.async_get(hass).last_states
+    now = dt_util.utcnow()
+    for registry_entry in er.async_entries_for_config_entry(er.async_get(hass), entry_id):
+        state = hass.states.get(registry_entry.entity_id)
+        if state is None:
+            continue
+        if registry_entry.unique_id.endswith("_heater_output"):
+            state = State(state.entity_id, "1500", state.attributes)
+        last_states[registry_entry.entity_id] = rs.StoredState(state, None, now)
+
+
+async def _bench_heaters(
+    hass: HomeAssistant, heaters: int, number: int
+) -> dict[str, dict[str, float]]:
+    """Measure the setup of a config entry with new and with restored entities."""
+    heater_ids = [f"climate.heater_{index}" for index in range(heaters)]
+    for index, entity_id in enumerate(heater_ids):
+        hass.states.async_set(
+            entity_id,
+            "heat",
+            {"hvac_action": "heating" if index % 3 else "idle", "temperature": 21},
+        )
+    hass.states.async_set(GAS_METER, "1000.0", {"unit_of_measurement": "m³"})
+
+    new: list[float] = []
+    restored: list[float] = []
+    option_writes = 0
+
+    def _count_option_writes(*_: Any) -> None:
+        nonlocal option_writes
+        option_writes += 1
+
+    for _ in range(number):
+        entry = create_entry(heater_ids)
+        start = time.perf_counter()
+        await hass.config_entries.async_add(entry)
+        new.append(time.perf_counter() - start)
+        await hass.async_block_till_done()
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        _restore_last_states(hass, entry.entry_id)
+        unsubscribe = entry.add_update_listener(_count_option_writes)
+        start = time.perf_counter()
+        await hass.config_entries.async_setup(entry.entry_id)
+        restored.append(time.perf_counter() - start)
+        await hass.async_block_till_done()
+        unsubscribe()
+
+        await hass.config_entries.async_remove(entry.entry_id)
+        rs.async_get(hass).last_states.clear()
+        await hass.async_block_till_done()
+
+    for entity_id in (*heater_ids, GAS_METER):
+        hass.states.async_remove(entity_id)
+    return {
+        "new": {"setup_ms": statistics.median(new) * 1000},
+        "restored": {
+            "setup_ms": statistics.median(restored) * 1000,
+            "option_writes": option_writes / number,
+        },
+    }
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """Run the benchmark for every heater count and print the results."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_start(config_dir)
+        print(f"{'heaters':>8} {'setup':<9} {'time':>12} {'option writes':>14}")
+        for heaters in args.heaters:
+            results = await _bench_heaters(hass, heaters, args.number)
+            for kind, values in results.items():
+                print(
+                    f"{heaters:>8} {kind:<9} {values['setup_ms']:>10.1f}ms"
+                    f" {values.get('option_writes', 0):>14.1f}"
+                )
+        await hass.async_stop(force=True)
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=3)
+    parser.add_argument("--heaters", type=int, nargs="+", default=HEATER_COUNTS)
+    args = parser.parse_args()
+    asyncio.run(_async_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Shared stand-ins for driving the coordinator outside of Home Assistant."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import inspect
+from pathlib import Path
+import sys
+from types import MappingProxyType
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.core import State  # noqa: E402
+
+from custom_components.ha_heat_calculator.const import (  # noqa: E402
+    CONF_CALCULATION_METHOD,
+    CONF_GAS_METER_ENTITY,
+    CONF_GAS_PRICE,
+    CONF_HEATER_AREAS,
+    CONF_HEATERS,
+    CONF_INCLUDE_WARM_WATER,
+    CONF_WARM_WATER_PERCENT,
+    DOMAIN,
+)
+
+GAS_METER = "sensor.gas_meter"
+
+
+class StateTable:
+    """Minimal stand-in for ``hass.states`` that never fires events."""
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self._states: dict[str, State] = {}
+
+    def get(self, entity_id: str) -> State | None:
+        """Return the state of an entity."""
+        return self._states.get(entity_id)
+
+    def set(
+        self,
+        entity_id: str,
+        state: str,
+        attributes: dict[str, Any],
+        when: datetime | None = None,
+    ) -> None:
+        """Replace the state of an entity with a new state object."""
+        old_state = self._states.get(entity_id)
+        last_changed = when
+        if old_state is not None and old_state.state == state:
+            last_changed = old_state.last_changed
+        self._states[entity_id] = State(
+            entity_id,
+            state,
+            attributes,
+            last_changed=last_changed,
+            last_updated=when,
+        )
+
+    def remove(self, entity_id: str) -> None:
+        """Remove an entity."""
+        self._states.pop(entity_id, None)
+
+
+# Cores with config subentries require them for a new entry, older cores reject the argument.
+_ENTRY_SUBENTRIES = (
+    {"subentries_data": ()}
+    if "subentries_data" in inspect.signature(ConfigEntry.__init__).parameters
+    else {}
+)
+
+
+def create_entry(heaters: list[str], **options: Any) -> ConfigEntry:
+    """Return a config entry for the given heaters."""
+    return ConfigEntry(
+        data={
+            CONF_GAS_METER_ENTITY: GAS_METER,
+            CONF_HEATERS: heaters,
+            CONF_INCLUDE_WARM_WATER: True,
+            CONF_WARM_WATER_PERCENT: 20,
+            CONF_CALCULATION_METHOD: "runtime_temp_weighted",
+            CONF_GAS_PRICE: 1.2,
+            CONF_HEATER_AREAS: {entity_id: 12.5 for entity_id in heaters},
+        },
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options=options,
+        source="user",
+        title="Benchmark",
+        unique_id=None,
+        version=1,
+        **_ENTRY_SUBENTRIES,
+    )
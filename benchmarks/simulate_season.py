@@ -0,0 +1,369 @@
+"""Time-warp simulation of whole heating seasons.
+
+Run with ``python benchmarks/simulate_season.py`` from a Home Assistant
+development environment. The coordinator runs on a virtual clock and is fed
+a thermostat and gas meter trace through the same state hub callbacks and
+refreshes it uses in Home Assistant, so a full winter takes seconds.
+
+The trace is either synthetic (seeded heating cycles, warm-water draws,
+meter resets, meter outages and heaters disappearing for a while) or a
+recorded JSON lines file with ``time``, ``entity_id``, ``state`` and
+``attributes`` per line; a ``null`` state removes the entity.
+
+After the run these invariants are checked and the script exits non-zero if
+one of them fails:
+
+- heater totals plus warm water equal the gas meter consumption seen at the
+  coordinator's readings,
+- every distribution round kept in memory adds up to its meter delta,
+- no heater total is negative.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import json
+import math
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+from typing import Any
+
+from harness import GAS_METER, StateTable, create_entry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ha_heat_calculator.const import CONF_METER_UPDATE_MODE
+from custom_components.ha_heat_calculator.coordinator import HeatCalculatorCoordinator
+from custom_components.ha_heat_calculator.hub import async_get_state_hub
+
+TOLERANCE = 1e-6
+
+
+@dataclass(slots=True)
+class TraceEvent:
+    """One state change of a trace."""
+
+    time: datetime
+    entity_id: str
+    state: str | None
+    attributes: dict[str, Any]
+
+
+class VirtualClock:
+    """Clock that only moves when the simulation advances it."""
+
+    def __init__(self, now: datetime) -> None:
+        """Initialize the clock."""
+        self.now = now
+
+    def __call__(self) -> datetime:
+        """Return the virtual time."""
+        return self.now
+
+
+def synthetic_trace(
+    heaters: int,
+    start: datetime,
+    days: int,
+    seed: int,
+    meter_interval: timedelta,
+    reset_every_days: int,
+    outage_every_days: int,
+) -> Iterator[TraceEvent]:
+    """Yield a reproducible heating season minute by minute."""
+    rng = random.Random(seed)
+    heater_ids = [f"climate.heater_{index}" for index in range(heaters)]
+    outputs = [rng.uniform(0.6, 2.4) for _ in heater_ids]
+    heating = [False] * heaters
+    missing = [False] * heaters
+    meter_value = rng.uniform(1000, 5000)
+    meter_offline = False
+    next_meter = start
+
+    for index, entity_id in enumerate(heater_ids):
+        yield TraceEvent(start, entity_id, "heat", _climate_attributes(False, 20.0))
+    yield TraceEvent(start, GAS_METER, f"{meter_value:.3f}", _meter_attributes())
+
+    for minute in range(1, days * 1440 + 1):
+        now = start + timedelta(minutes=minute)
+        day = minute // 1440
+        # Colder in the middle of the season, so heaters run longer cycles.
+        demand = 0.25 + 0.5 * math.sin(math.pi * min(day / max(days, 1), 1.0))
+        for index, entity_id in enumerate(heater_ids):
+            if outage_every_days and minute % (outage_every_days * 1440) == 600 + index:
+                missing[index] = True
+                yield TraceEvent(now, entity_id, None, {})
+                continue
+            if missing[index]:
+                if minute % (outage_every_days * 1440) < 720 + index:
+                    continue
+                missing[index] = False
+                heating[index] = False
+                yield TraceEvent(now, entity_id, "heat", _climate_attributes(False, 20.0))
+            switch_probability = 0.04 if heating[index] else 0.04 * demand
+            if rng.random() < switch_probability:
+                heating[index] = not heating[index]
+                current = 18.0 + rng.random() * 3 if heating[index] else 21.0
+                yield TraceEvent(
+                    now, entity_id, "heat", _climate_attributes(heating[index], current)
+                )
+            if heating[index]:
+                meter_value += outputs[index] / 60 / 10
+
+        if rng.random() < 0.01:
+            meter_value += rng.uniform(0.02, 0.1)
+
+        if reset_every_days and minute % (reset_every_days * 1440) == 0:
+            meter_value = 0.0
+            yield TraceEvent(now, GAS_METER, f"{meter_value:.3f}", _meter_attributes())
+            next_meter = now + meter_interval
+            continue
+
+        if outage_every_days:
+            position = minute % (outage_every_days * 1440)
+            if position == 240:
+                meter_offline = True
+                yield TraceEvent(now, GAS_METER, "unavailable", {})
+            elif position == 360:
+                meter_offline = False
+        if now >= next_meter and not meter_offline:
+            yield TraceEvent(now, GAS_METER, f"{meter_value:.3f}", _meter_attributes())
+            next_meter = now + meter_interval
+
+
+def _climate_attributes(heating: bool, current_temperature: float) -> dict[str, Any]:
+    """Return thermostat attributes."""
+    return {
+        "hvac_action": "heating" if heating else "idle",
+        "current_temperature": round(current_temperature, 1),
+        "temperature": 21.0,
+    }
+
+
+def _meter_attributes() -> dict[str, Any]:
+    """Return gas meter attributes."""
+    return {"unit_of_measurement": "m³", "state_class": "total_increasing"}
+
+
+def load_trace(path: Path) -> list[TraceEvent]:
+    """Read a recorded trace from a JSON lines file, ordered by time."""
+    events = []
+    with path.open(encoding="utf-8") as trace_file:
+        for line in trace_file:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            events.append(
+                TraceEvent(
+                    dt_util.as_utc(dt_util.parse_datetime(item["time"])),
+                    item["entity_id"],
+                    item.get("state"),
+                    item.get("attributes") or {},
+                )
+            )
+    events.sort(key=lambda event: event.time)
+    return events
+
+
+class SeasonSimulator:
+    """Drive a coordinator through a trace on a virtual clock."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        states: StateTable,
+        heaters: list[str],
+        start: datetime,
+        meter_update_mode: str,
+    ) -> None:
+        """Initialize the simulator."""
+        self.hass = hass
+        self.states = states
+        self.clock = VirtualClock(start)
+        self.coordinator = HeatCalculatorCoordinator(
+            hass,
+            create_entry(heaters, **{CONF_METER_UPDATE_MODE: meter_update_mode}),
+            clock=self.clock,
+        )
+        self.hub = async_get_state_hub(hass)
+        self.events = 0
+        self.refreshes = 0
+        self.observed_consumption = 0.0
+        self._last_sample: float | None = None
+        self._unsubscribe = [
+            self.coordinator.async_start_effort_tracking(),
+            self.coordinator.async_start_meter_tracking(),
+        ]
+
+    async def run(self, trace: Iterable[TraceEvent], end: datetime | None = None) -> None:
+        """Replay the trace, refreshing at every elapsed update interval."""
+        next_refresh: datetime | None = None
+        for event in trace:
+            if next_refresh is None:
+                next_refresh = event.time
+            while next_refresh <= event.time:
+                await self._refresh(next_refresh)
+                next_refresh += self.coordinator.update_interval
+            self._apply(event)
+
+        if next_refresh is not None:
+            await self._refresh(max(end or next_refresh, self.clock.now))
+
+    async def _refresh(self, when: datetime) -> None:
+        """Run one coordinator refresh at the given time."""
+        self.clock.now = when
+        await self.coordinator._async_update_data()
+        self.refreshes += 1
+        self._sample()
+
+    def _apply(self, event: TraceEvent) -> None:
+        """Set a state and notify the coordinator like a state change event."""
+        self.clock.now = event.time
+        if event.state is None:
+            self.states.remove(event.entity_id)
+        else:
+            self.states.set(event.entity_id, event.state, event.attributes, event.time)
+        self.events += 1
+        self.hub.async_notify(event.entity_id, event.time)
+        if (
+            event.entity_id == GAS_METER
+            and self.coordinator.meter_update_mode == "state_change"
+            and self.refreshes
+        ):
+            self._sample()
+
+    def _sample(self) -> None:
+        """Mirror a meter reading of the coordinator to track the expected consumption."""
+        state = self.states.get(GAS_METER)
+        try:
+            value = float(state.state)
+        except (AttributeError, TypeError, ValueError):
+            return
+        if self._last_sample is not None and value > self._last_sample:
+            self.observed_consumption += value - self._last_sample
+        self._last_sample = value
+
+    def check_invariants(self) -> list[str]:
+        """Return a description of every violated invariant."""
+        coordinator = self.coordinator
+        violations = []
+        totals = {
+            entity_id: stats.total_allocated for entity_id, stats in coordinator.data.items()
+        }
+        allocated = sum(totals.values()) + coordinator.warm_water_total_allocated
+        if not math.isclose(
+            allocated, self.observed_consumption, rel_tol=TOLERANCE, abs_tol=TOLERANCE
+        ):
+            violations.append(
+                f"allocated {allocated:.6f} != meter consumption "
+                f"{self.observed_consumption:.6f}"
+            )
+
+        for distribution in coordinator.rounds.rounds(
+            datetime.min.replace(tzinfo=dt_util.UTC), self.clock.now
+        ):
+            shares = sum(distribution["heaters"].values()) + distribution["warm_water"]
+            if not math.isclose(
+                shares, distribution["delta_gas"], rel_tol=TOLERANCE, abs_tol=TOLERANCE
+            ):
+                violations.append(
+                    f"round at {distribution['time']} allocated {shares:.6f} "
+                    f"of {distribution['delta_gas']:.6f}"
+                )
+                break
+
+        violations.extend(
+            f"{entity_id} has a negative total {total:.6f}"
+            for entity_id, total in totals.items()
+            if total < 0
+        )
+        return violations
+
+    async def async_close(self) -> None:
+        """Stop tracking and write the stores."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        await self.coordinator.async_shutdown()
+
+
+async def _async_main(args: argparse.Namespace) -> int:
+    """Run the simulation and return the exit code."""
+    start = dt_util.parse_datetime(args.start) or dt_util.utcnow()
+    start = dt_util.as_utc(start)
+    if args.trace is not None:
+        trace: Iterable[TraceEvent] = load_trace(args.trace)
+        if trace:
+            start = trace[0].time
+        heaters = sorted(
+            {event.entity_id for event in trace if event.entity_id.startswith("climate.")}
+        )
+        end = None
+    else:
+        heaters = [f"climate.heater_{index}" for index in range(args.heaters)]
+        trace = synthetic_trace(
+            args.heaters,
+            start,
+            args.days,
+            args.seed,
+            timedelta(minutes=args.meter_interval),
+            args.reset_every,
+            args.outage_every,
+        )
+        end = start + timedelta(days=args.days)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.states = StateTable()
+        simulator = SeasonSimulator(
+            hass, hass.states, heaters, start, args.meter_update_mode
+        )
+        started = time.perf_counter()
+        await simulator.run(trace, end)
+        elapsed = time.perf_counter() - started
+        violations = simulator.check_invariants()
+        await simulator.async_close()
+        await hass.async_stop(force=True)
+
+    coordinator = simulator.coordinator
+    print(
+        f"simulated {simulator.events} state changes and {simulator.refreshes} refreshes"
+        f" in {elapsed:.2f}s"
+    )
+    print(f"meter consumption: {simulator.observed_consumption:.3f}")
+    print(f"warm water:        {coordinator.warm_water_total_allocated:.3f}")
+    for entity_id, stats in coordinator.data.items():
+        print(f"{entity_id + ':':<19}{stats.total_allocated:.3f}")
+    for violation in violations:
+        print(f"invariant violated: {violation}")
+    return 1 if violations else 0
+
+
+def main() -> None:
+    """Parse arguments and run the simulation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", type=Path, help="replay a recorded JSON lines trace")
+    parser.add_argument("--heaters", type=int, default=6)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--start", default="2025-10-01T00:00:00+00:00", help="start of a synthetic trace"
+    )
+    parser.add_argument("--meter-interval", type=int, default=15, help="minutes")
+    parser.add_argument("--reset-every", type=int, default=60, help="days, 0 disables")
+    parser.add_argument("--outage-every", type=int, default=7, help="days, 0 disables")
+    parser.add_argument(
+        "--meter-update-mode", choices=("interval", "state_change"), default="interval"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_async_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,17 @@
 from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.typing import ConfigType
 
 from .coordinator import HeatCalculatorCoordinator
 from .const import DOMAIN
 from .device import build_device_info
+from .instrumentation import async_remove_instrumentation
+from .services import async_setup_services
+from .storage import async_get_journal_store, async_get_ledger_store
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
@@ -18,6 +22,14 @@ PLATFORMS: list[Platform] = [
     Platform.SWITCH,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the HA Heat Calculator services."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HA Heat Calculator from a config entry."""
@@ -28,8 +40,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         **device_info,
     )
     coordinator = HeatCalculatorCoordinator(hass, entry)
+    coordinator.async_restore_settings()
+    await coordinator.async_load_ledger()
+    await coordinator.async_recover()
+    entry.async_on_unload(coordinator.async_start_effort_tracking())
     await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.async_start_meter_tracking())
+    entry.async_on_unload(coordinator.async_start_statistics_export())
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, coordinator.async_handle_stop)
+    )
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -45,6 +66,22 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored allocation ledger and journal of a deleted config entry."""
+    await async_get_ledger_store(hass, entry.entry_id).async_remove()
+    await async_get_journal_store(hass, entry.entry_id).async_remove()
+    async_remove_instrumentation(hass, entry.entry_id)
+
+
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options updates by reloading the integration entry."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply options in place and reload only when heaters or gas meter changed."""
+    coordinator: HeatCalculatorCoordinator | None = hass.data.get(DOMAIN, {}).get(
+        entry.entry_id
+    )
+    if coordinator is None:
+        return
+    if coordinator.requires_reload():
+        coordinator.metrics.count("reloads")
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.async_apply_entry_options()
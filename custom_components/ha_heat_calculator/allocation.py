@@ -0,0 +1,252 @@
+"""Array-backed gas allocation core for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Sequence
+from operator import add, mul
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, plain arrays are used without it.
+    np = None
+
+# Below this many heaters the call overhead of NumPy outweighs its vector speed.
+NUMPY_MIN_HEATERS = 100
+
+
+class AllocationCore:
+    """Struct-of-arrays storage of per-heater weights, effort and totals.
+
+    Heaters are addressed by their position in ``heaters``. Weights combine the
+    configured area and output factors and are compiled once per configuration,
+    so a distribution round is a handful of vector operations.
+
+    A round only adds to the lifetime totals. Costs are the costs at the last
+    price change plus the gas allocated since then at the current price, and
+    every named period counter is the difference to a snapshot taken when the
+    owner resets it at the start of its period, so neither is touched per round.
+    """
+
+    def __init__(
+        self,
+        heaters: Sequence[str],
+        periods: Iterable[str] = (),
+        use_numpy: bool | None = None,
+    ) -> None:
+        """Initialize empty arrays for the given heaters and period counters.
+
+        ``use_numpy`` defaults to NumPy, if installed, from ``NUMPY_MIN_HEATERS``
+        heaters on.
+        """
+        self.heaters = list(heaters)
+        if use_numpy is None:
+            use_numpy = len(self.heaters) >= NUMPY_MIN_HEATERS
+        self.use_numpy = use_numpy and np is not None
+        self.index = {entity_id: index for index, entity_id in enumerate(self.heaters)}
+        self.size = len(self.heaters)
+        self.weights = self._vector([1.0] * self.size)
+        self.effort = self._vector([0.0] * self.size)
+        self.totals = self._vector([0.0] * self.size)
+        self.price = 0.0
+        self._cost_base = self._vector([0.0] * self.size)
+        self._price_base = self._vector([0.0] * self.size)
+        self._period_bases = {period: self._vector([0.0] * self.size) for period in periods}
+        self._period_cost_bases = {
+            period: self._vector([0.0] * self.size) for period in self._period_bases
+        }
+
+    def _vector(self, values: Iterable[float]):
+        """Return a contiguous float vector for the active backend."""
+        if self.use_numpy:
+            return np.fromiter(values, dtype=np.float64, count=self.size)
+        return array("d", values)
+
+    @property
+    def costs(self):
+        """Return the vector of per-heater costs."""
+        if self.use_numpy:
+            return self._cost_base + (self.totals - self._price_base) * self.price
+        price = self.price
+        return array(
+            "d",
+            [
+                base + (total - price_base) * price
+                for base, total, price_base in zip(
+                    self._cost_base, self.totals, self._price_base
+                )
+            ],
+        )
+
+    def set_weights(self, weights: Iterable[float]) -> None:
+        """Replace the compiled per-heater weight vector."""
+        self.weights = self._vector(weights)
+
+    def copy_from(self, other: AllocationCore) -> None:
+        """Carry effort, totals and costs of heaters that are also in ``other``."""
+        self.set_price(other.price)
+        for entity_id, index in self.index.items():
+            other_index = other.index.get(entity_id)
+            if other_index is None:
+                continue
+            self.effort[index] = other.effort[other_index]
+            self.set_total(index, other.totals[other_index])
+            self.set_cost(index, other.cost(other_index))
+            for period in self._period_bases.keys() & other._period_bases.keys():
+                self.set_period_total(period, index, other.period_total(period, other_index))
+                self.set_period_cost(period, index, other.period_cost(period, other_index))
+
+    def set_price(self, price: float) -> None:
+        """Price the gas of the following rounds at ``price``."""
+        if price == self.price:
+            return
+        self._cost_base = self.costs
+        self._price_base = self._vector(self.totals)
+        self.price = price
+
+    def distribute(
+        self, amount: float, effort: Sequence[float] | None = None, price: float = 0.0
+    ) -> Sequence[float]:
+        """Add ``amount`` to the totals in proportion to weighted effort.
+
+        ``effort`` defaults to the effort window. Without any weighted effort the
+        amount is split equally. The shares are priced at ``price``. The effort
+        window is cleared afterwards and the per-heater shares of this round
+        are returned.
+        """
+        if self.size == 0:
+            return self._vector([])
+
+        if effort is None:
+            effort = self.effort
+        self.set_price(price)
+
+        if self.use_numpy:
+            weighted = np.asarray(effort, dtype=np.float64) * self.weights
+            total_effort = float(weighted.sum())
+            if total_effort > 0:
+                shares = weighted * (amount / total_effort)
+            else:
+                # If no heating runtime was seen, distribute equally as a fallback.
+                shares = np.full(self.size, amount / self.size)
+            self.totals += shares
+        else:
+            weighted = list(map(mul, effort, self.weights))
+            total_effort = sum(weighted)
+            if total_effort > 0:
+                scale = amount / total_effort
+                shares = array("d", [value * scale for value in weighted])
+            else:
+                # If no heating runtime was seen, distribute equally as a fallback.
+                shares = array("d", [amount / self.size]) * self.size
+            self.totals = array("d", map(add, self.totals, shares))
+
+        self.reset_effort()
+        return shares
+
+    def set_total(self, index: int, value: float) -> None:
+        """Set the total gas of a heater without changing its cost or periods."""
+        delta = value - self.totals[index]
+        self.totals[index] = value
+        self._price_base[index] += delta
+        for bases in self._period_bases.values():
+            bases[index] += delta
+
+    def cost(self, index: int) -> float:
+        """Return the cost of the gas allocated to a heater."""
+        return float(
+            self._cost_base[index]
+            + (self.totals[index] - self._price_base[index]) * self.price
+        )
+
+    def set_cost(self, index: int, value: float) -> None:
+        """Set the cost of a heater without changing its period costs."""
+        delta = value - self.cost(index)
+        self._cost_base[index] += delta
+        for bases in self._period_cost_bases.values():
+            bases[index] += delta
+
+    def period_total(self, period: str, index: int) -> float:
+        """Return the gas allocated to a heater in the current period."""
+        return float(self.totals[index] - self._period_bases[period][index])
+
+    def set_period_total(self, period: str, index: int, value: float) -> None:
+        """Set the gas allocated to a heater in the current period."""
+        self._period_bases[period][index] = self.totals[index] - value
+
+    def period_cost(self, period: str, index: int) -> float:
+        """Return the cost of the gas allocated to a heater in the current period."""
+        return self.cost(index) - float(self._period_cost_bases[period][index])
+
+    def set_period_cost(self, period: str, index: int, value: float) -> None:
+        """Set the cost of the gas allocated to a heater in the current period."""
+        self._period_cost_bases[period][index] = self.cost(index) - value
+
+    def reset_period(self, period: str) -> None:
+        """Start a period counter from zero when its period rolls over."""
+        self._period_bases[period] = self._vector(self.totals)
+        self._period_cost_bases[period] = self.costs
+
+    def reset_effort(self) -> None:
+        """Clear the effort window after a gas allocation round."""
+        if self.use_numpy:
+            self.effort.fill(0.0)
+        else:
+            self.effort = array("d", bytes(8 * self.size))
+
+
+class HeaterStats:
+    """View on one heater's effort and allocated gas inside an allocation core."""
+
+    __slots__ = ("_core", "_index")
+
+    def __init__(self, core: AllocationCore, index: int) -> None:
+        """Initialize the view."""
+        self._core = core
+        self._index = index
+
+    @property
+    def effort_window(self) -> float:
+        """Return the effort collected since the last allocation round."""
+        return float(self._core.effort[self._index])
+
+    @effort_window.setter
+    def effort_window(self, value: float) -> None:
+        """Set the effort collected since the last allocation round."""
+        self._core.effort[self._index] = value
+
+    @property
+    def total_cost(self) -> float:
+        """Return the cost of the gas allocated to the heater."""
+        return self._core.cost(self._index)
+
+    @total_cost.setter
+    def total_cost(self, value: float) -> None:
+        """Set the cost of the gas allocated to the heater."""
+        self._core.set_cost(self._index, value)
+
+    @property
+    def total_allocated(self) -> float:
+        """Return the total gas allocated to the heater."""
+        return float(self._core.totals[self._index])
+
+    @total_allocated.setter
+    def total_allocated(self, value: float) -> None:
+        """Set the total gas allocated to the heater."""
+        self._core.set_total(self._index, value)
+
+    def period_total(self, period: str) -> float:
+        """Return the gas allocated to the heater in the current period."""
+        return self._core.period_total(period, self._index)
+
+    def set_period_total(self, period: str, value: float) -> None:
+        """Set the gas allocated to the heater in the current period."""
+        self._core.set_period_total(period, self._index, value)
+
+    def period_cost(self, period: str) -> float:
+        """Return the cost of the gas allocated to the heater in the current period."""
+        return self._core.period_cost(period, self._index)
+
+    def set_period_cost(self, period: str, value: float) -> None:
+        """Set the cost of the gas allocated to the heater in the current period."""
+        self._core.set_period_cost(period, self._index, value)
@@ -15,15 +15,25 @@ from .const import (
     CONF_CALCULATION_METHOD,
     CONF_GAS_METER_ENTITY,
     CONF_GAS_PRICE,
+    CONF_GAS_PRICE_ENTITY,
+    CONF_HEATER_GROUPS,
+    CONF_HEATER_VALVES,
     CONF_HEATERS,
     CONF_INCLUDE_WARM_WATER,
+    CONF_INSTRUMENTATION,
+    CONF_METER_UPDATE_MODE,
     CONF_WARM_WATER_PERCENT,
     DEFAULT_CALCULATION_METHOD,
     DEFAULT_GAS_PRICE,
     DEFAULT_INCLUDE_WARM_WATER,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_METER_UPDATE_MODE,
     DEFAULT_WARM_WATER_PERCENT,
     DOMAIN,
+    METER_UPDATE_MODES,
 )
+from .effort import parse_valves
+from .groups import parse_groups
 
 
 class HeatCalculatorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -36,9 +46,8 @@ class HeatCalculatorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            if not user_input.get(CONF_HEATERS):
-                errors[CONF_HEATERS] = "at_least_one_heater"
-            else:
+            errors = _validate_input(user_input)
+            if not errors:
                 return self.async_create_entry(title="Heat Calculator", data=user_input)
 
         defaults = user_input or {}
@@ -94,6 +103,28 @@ class HeatCalculatorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _required_key(CONF_GAS_PRICE, DEFAULT_GAS_PRICE): selector.NumberSelector(
                     selector.NumberSelectorConfig(min=0, max=100, step=0.01)
                 ),
+                vol.Optional(
+                    CONF_GAS_PRICE_ENTITY,
+                    description={"suggested_value": defaults.get(CONF_GAS_PRICE_ENTITY)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain=["sensor", "input_number", "number"], multiple=False
+                    )
+                ),
+                _required_key(
+                    CONF_METER_UPDATE_MODE, DEFAULT_METER_UPDATE_MODE
+                ): selector.SelectSelector(
+                    SelectSelectorConfig(
+                        options=list(METER_UPDATE_MODES.keys()),
+                        mode="dropdown",
+                        translation_key=CONF_METER_UPDATE_MODE,
+                    )
+                ),
+                _required_key(CONF_HEATER_GROUPS, {}): selector.ObjectSelector(),
+                _required_key(CONF_HEATER_VALVES, {}): selector.ObjectSelector(),
+                _required_key(
+                    CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION
+                ): selector.BooleanSelector(),
             }
         )
 
@@ -117,10 +148,22 @@ class HeatCalculatorOptionsFlow(config_entries.OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            if not user_input.get(CONF_HEATERS):
-                errors[CONF_HEATERS] = "at_least_one_heater"
-            else:
-                return self.async_create_entry(title="", data=user_input)
+            errors = _validate_input(user_input)
+            if not errors:
+                coordinator = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+                if coordinator is not None:
+                    # Setting changes still waiting to be written are part of the options.
+                    coordinator.async_flush_options()
+                # Heater areas and outputs are not on the form and must be kept. A
+                # cleared price entity is omitted and must not fall back to the entry data.
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **self.config_entry.options,
+                        CONF_GAS_PRICE_ENTITY: None,
+                        **user_input,
+                    },
+                )
 
         defaults = user_input or {**self.config_entry.data, **self.config_entry.options}
         if CONF_GAS_PRICE not in defaults:
@@ -134,6 +177,23 @@ class HeatCalculatorOptionsFlow(config_entries.OptionsFlow):
         )
 
 
+def _validate_input(user_input: dict) -> dict[str, str]:
+    """Return form errors of the submitted configuration."""
+    errors: dict[str, str] = {}
+    if not user_input.get(CONF_HEATERS):
+        errors[CONF_HEATERS] = "at_least_one_heater"
+        return errors
+    try:
+        parse_groups(user_input.get(CONF_HEATER_GROUPS), user_input[CONF_HEATERS])
+    except ValueError:
+        errors[CONF_HEATER_GROUPS] = "invalid_heater_groups"
+    try:
+        parse_valves(user_input.get(CONF_HEATER_VALVES), user_input[CONF_HEATERS])
+    except ValueError:
+        errors[CONF_HEATER_VALVES] = "invalid_heater_valves"
+    return errors
+
+
 async def _async_get_energy_gas_price(hass) -> float | None:
     """Return the fixed gas price from the Energy dashboard if configured."""
     try:
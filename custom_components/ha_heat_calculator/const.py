@@ -11,17 +11,59 @@ CONF_INCLUDE_WARM_WATER = "include_warm_water"
 CONF_WARM_WATER_PERCENT = "warm_water_percent"
 CONF_CALCULATION_METHOD = "calculation_method"
 CONF_GAS_PRICE = "gas_price"
+CONF_GAS_PRICE_ENTITY = "gas_price_entity"
 CONF_HEATER_AREAS = "heater_areas"
 CONF_HEATER_OUTPUTS = "heater_outputs"
+CONF_HEATER_GROUPS = "heater_groups"
+CONF_HEATER_VALVES = "heater_valves"
+CONF_METER_UPDATE_MODE = "meter_update_mode"
+CONF_INSTRUMENTATION = "instrumentation"
 
 DEFAULT_INCLUDE_WARM_WATER = False
 DEFAULT_WARM_WATER_PERCENT = 20.0
 DEFAULT_CALCULATION_METHOD = "runtime_temp_weighted"
 DEFAULT_GAS_PRICE = 0.0
+DEFAULT_METER_UPDATE_MODE = "interval"
+DEFAULT_INSTRUMENTATION = False
 
 CALCULATION_METHODS = {
     "runtime_only": "Runtime only",
     "runtime_temp_weighted": "Runtime with temperature delta weighting",
 }
 
+METER_UPDATE_MODES = {
+    "interval": "Fixed interval",
+    "state_change": "On gas meter state change",
+}
+
 UPDATE_INTERVAL_SECONDS = 300
+WATCHDOG_INTERVAL_SECONDS = 3600
+OPTIONS_SAVE_DELAY_SECONDS = 5
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY_SECONDS = 30
+JOURNAL_SAVE_DELAY_SECONDS = 10
+
+# Recorder history is read in windows of this size to bound memory use.
+HISTORY_CHUNK_HOURS = 6
+
+# Effort history kept for aligning late meter readings: 24 hours in 1 minute buckets.
+EFFORT_BUFFER_BUCKET_SECONDS = 60
+EFFORT_BUFFER_BUCKETS = 1440
+
+# Distribution rounds kept in memory for range queries, bounded in rounds and
+# in stored values (one per heater plus timestamp, meter delta and warm water).
+LEDGER_MAX_ROUNDS = 8760
+LEDGER_MAX_VALUES = 500_000
+
+# Gas totals kept per heater for the current local day, month and year, keyed
+# by the billing period they roll over with.
+PERIOD_COUNTERS = {"daily": "day", "monthly": "month", "yearly": "year"}
+
+# Refresh cycles kept for diagnostics (one day at the 5-minute interval), fewer
+# with many heaters so the trace stays below the per-heater value limit.
+CYCLE_TRACE_MAX_CYCLES = 288
+CYCLE_TRACE_MAX_VALUES = 100_000
+
+# Duration samples kept per instrumented operation for percentiles.
+INSTRUMENTATION_SAMPLES = 256
@@ -2,62 +2,132 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+import asyncio
+from collections.abc import Callable, Sequence
 from datetime import datetime, timedelta
+from functools import partial
 import logging
+from operator import add
+from pathlib import Path
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import UnitOfVolume
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, State, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.helpers.restore_state import async_get as async_get_restore_data
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
 from .const import (
+    CALCULATION_METHODS,
     CONF_CALCULATION_METHOD,
     CONF_GAS_METER_ENTITY,
     CONF_GAS_PRICE,
+    CONF_GAS_PRICE_ENTITY,
     CONF_HEATERS,
     CONF_HEATER_AREAS,
+    CONF_HEATER_GROUPS,
     CONF_HEATER_OUTPUTS,
+    CONF_HEATER_VALVES,
     CONF_INCLUDE_WARM_WATER,
+    CONF_INSTRUMENTATION,
+    CONF_METER_UPDATE_MODE,
     CONF_WARM_WATER_PERCENT,
     DEFAULT_CALCULATION_METHOD,
     DEFAULT_GAS_PRICE,
     DEFAULT_INCLUDE_WARM_WATER,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_METER_UPDATE_MODE,
     DEFAULT_WARM_WATER_PERCENT,
     DOMAIN,
+    EFFORT_BUFFER_BUCKET_SECONDS,
+    EFFORT_BUFFER_BUCKETS,
+    JOURNAL_SAVE_DELAY_SECONDS,
+    METER_UPDATE_MODES,
+    PERIOD_COUNTERS,
+    OPTIONS_SAVE_DELAY_SECONDS,
+    STORAGE_SAVE_DELAY_SECONDS,
     UPDATE_INTERVAL_SECONDS,
+    WATCHDOG_INTERVAL_SECONDS,
 )
+from .allocation import AllocationCore, HeaterStats
+from .cycles import CycleTrace
+from .effort import (
+    EffortIntegrator,
+    EffortRingBuffer,
+    RecordedEffortRates,
+    parse_valves,
+    valve_effort_rate,
+)
+from .export import BillingExport
+from .groups import ZoneGroups, parse_groups
+from .history import async_get_state_changes, iter_state_changes, recorder_available
+from .hub import HeaterState, MeterReading, async_get_state_hub
+from .instrumentation import async_get_instrumentation
+from .ledger import AllocationLedger
+from .periods import period_end, period_start
+from .replay import AllocationReplay
+from .statistics import AllocationStatistics
+from .storage import async_get_journal_store, async_get_ledger_store
 
 _LOGGER = logging.getLogger(__name__)
 MIN_WARM_WATER_PERCENT = 0.0
 MAX_WARM_WATER_PERCENT = 100.0
 
 
-@dataclass
-class HeaterStats:
-    """Track effort and allocated gas for one heater."""
-
-    effort_window: float = 0.0
-    total_allocated: float = 0.0
-
-
 class HeatCalculatorCoordinator(DataUpdateCoordinator[dict[str, HeaterStats]]):
     """Coordinate gas distribution updates."""
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        clock: Callable[[], datetime] = dt_util.utcnow,
+    ) -> None:
+        """Initialize coordinator.
+
+        ``clock`` returns the current time and lets simulations run on a
+        virtual timeline.
+        """
         self.config_entry = entry
+        self._clock = clock
 
         self._last_sample_time: datetime | None = None
         self._last_gas_value: float | None = None
+        self._last_gas_time: datetime | None = None
         self.last_delta_gas: float = 0.0
         self.last_distributable_gas: float = 0.0
         self.last_warm_water_deducted: float = 0.0
+        self.last_gas_price: float | None = None
         self.last_distribution_time: datetime | None = None
+        self.last_shares: Sequence[float] = ()
         self.warm_water_total_allocated: float = 0.0
+        self.warm_water_periods = dict.fromkeys(PERIOD_COUNTERS, 0.0)
+        self.period_starts: dict[str, datetime | None] = dict.fromkeys(PERIOD_COUNTERS)
+        self._periods_end: datetime | None = None
+        self.states_written = 0
+        self.states_skipped = 0
+        self.config_version = 0
+        self._effort = EffortIntegrator(self._credit_effort)
+        self._effort_buffer = EffortRingBuffer(0)
+        self._core = AllocationCore([])
+        self.rounds = AllocationLedger([])
+        self.groups = ZoneGroups({}, [])
+        self.cycles = CycleTrace([])
+        self._pending_options: dict[str, Any] = {}
+        self._backfill_lock = asyncio.Lock()
+        self._store = async_get_ledger_store(hass, entry.entry_id)
+        self._journal = async_get_journal_store(hass, entry.entry_id)
+        self._statistics = AllocationStatistics(hass, entry.entry_id, entry.title)
+        self._hub = async_get_state_hub(hass)
+        self.metrics = async_get_instrumentation(hass, entry.entry_id)
 
         super().__init__(
             hass,
@@ -66,59 +136,834 @@ class HeatCalculatorCoordinator(DataUpdateCoordinator[dict[str, HeaterStats]]):
             name=DOMAIN,
             update_interval=timedelta(seconds=UPDATE_INTERVAL_SECONDS),
         )
+        self._options_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=OPTIONS_SAVE_DELAY_SECONDS,
+            immediate=False,
+            function=self.async_flush_options,
+        )
 
         self._apply_config()
 
     def _apply_config(self) -> None:
         """Load and apply current config/option values."""
         entry = self.config_entry
-        self.gas_meter_entity_id = entry.options.get(
+        options = {**entry.options, **self._pending_options}
+        self.gas_meter_entity_id = options.get(
             CONF_GAS_METER_ENTITY, entry.data[CONF_GAS_METER_ENTITY]
         )
-        self.heaters = entry.options.get(CONF_HEATERS, entry.data[CONF_HEATERS])
+        self.heaters = options.get(CONF_HEATERS, entry.data[CONF_HEATERS])
         self.include_warm_water = bool(
-            entry.options.get(
+            options.get(
                 CONF_INCLUDE_WARM_WATER,
                 entry.data.get(CONF_INCLUDE_WARM_WATER, DEFAULT_INCLUDE_WARM_WATER),
             )
         )
         self.warm_water_percent = self._sanitize_warm_water_percent(
-            entry.options.get(
+            options.get(
                 CONF_WARM_WATER_PERCENT,
                 entry.data.get(CONF_WARM_WATER_PERCENT, DEFAULT_WARM_WATER_PERCENT),
             )
         )
         self.heater_areas = self._sanitize_heater_mapping(
-            entry.options.get(CONF_HEATER_AREAS, entry.data.get(CONF_HEATER_AREAS, {}))
+            options.get(CONF_HEATER_AREAS, entry.data.get(CONF_HEATER_AREAS, {}))
         )
         self.heater_outputs = self._sanitize_heater_mapping(
-            entry.options.get(
+            options.get(
                 CONF_HEATER_OUTPUTS, entry.data.get(CONF_HEATER_OUTPUTS, {})
             )
         )
-        self.calculation_method = entry.options.get(
+        self.calculation_method = options.get(
             CONF_CALCULATION_METHOD,
             entry.data.get(CONF_CALCULATION_METHOD, DEFAULT_CALCULATION_METHOD),
         )
         self.gas_price = self._sanitize_gas_price(
-            entry.options.get(
+            options.get(
                 CONF_GAS_PRICE, entry.data.get(CONF_GAS_PRICE, DEFAULT_GAS_PRICE)
             )
         )
+        self.gas_price_entity_id = (
+            options.get(CONF_GAS_PRICE_ENTITY, entry.data.get(CONF_GAS_PRICE_ENTITY))
+            or None
+        )
+        self.meter_update_mode = options.get(
+            CONF_METER_UPDATE_MODE,
+            entry.data.get(CONF_METER_UPDATE_MODE, DEFAULT_METER_UPDATE_MODE),
+        )
+        if self.meter_update_mode not in METER_UPDATE_MODES:
+            self.meter_update_mode = DEFAULT_METER_UPDATE_MODE
+        self.instrumentation = bool(
+            options.get(
+                CONF_INSTRUMENTATION,
+                entry.data.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION),
+            )
+        )
+        self.metrics.enabled = self.instrumentation
+        # In state change mode the meter drives allocation and polling is only a watchdog.
+        self.update_interval = timedelta(
+            seconds=WATCHDOG_INTERVAL_SECONDS
+            if self.meter_update_mode == "state_change"
+            else UPDATE_INTERVAL_SECONDS
+        )
 
-        existing = self.data or {}
-        self.data = {
-            entity_id: HeaterStats(total_allocated=existing.get(entity_id, HeaterStats()).total_allocated)
-            for entity_id in self.heaters
-        }
+        # A reordered heater list keeps the core, its column order and everything keyed by it.
+        if self.data is None or set(self._core.heaters) != set(self.heaters):
+            core = AllocationCore(self.heaters, PERIOD_COUNTERS)
+            core.copy_from(self._core)
+            self._core = core
+            self._effort_buffer = EffortRingBuffer(core.size)
+            self.rounds = AllocationLedger(core.heaters)
+            self.cycles = CycleTrace(core.heaters)
+            self._statistics.set_heaters(core.heaters)
+            self.data = {
+                entity_id: HeaterStats(core, index)
+                for entity_id, index in core.index.items()
+            }
+        self._core.set_weights(
+            self._heater_area_factor(entity_id) * self._heater_output_factor(entity_id)
+            for entity_id in self._core.heaters
+        )
+        self.cycles.set_weights(self._core.weights)
+        self.heater_valves = self._parse_heater_valves(options)
+        self._valve_heaters: dict[str, list[str]] = {}
+        for heater_entity_id, valve_entity_id in self.heater_valves.items():
+            self._valve_heaters.setdefault(valve_entity_id, []).append(heater_entity_id)
+        self.groups = ZoneGroups(self._parse_heater_groups(options), self._core.heaters)
+        self.groups.rebuild(self._core.totals, self._core.costs)
+        self._effort.retain(self.heaters)
+        self._refresh_effort_rates(self._clock())
+        # Lets entities rebuild cached attributes derived from the configuration.
+        self.config_version += 1
+
+    def _parse_heater_groups(self, options: dict[str, Any]) -> dict[str, str | None]:
+        """Return the parent of every configured group and grouped heater."""
+        groups = options.get(
+            CONF_HEATER_GROUPS, self.config_entry.data.get(CONF_HEATER_GROUPS, {})
+        )
+        try:
+            return parse_groups(groups, self.heaters)
+        except ValueError as err:
+            _LOGGER.warning("Ignoring invalid heater groups: %s", err)
+            return {}
+
+    def _parse_heater_valves(self, options: dict[str, Any]) -> dict[str, str]:
+        """Return the valve position entity of every heater that has one."""
+        valves = options.get(
+            CONF_HEATER_VALVES, self.config_entry.data.get(CONF_HEATER_VALVES, {})
+        )
+        try:
+            return parse_valves(valves, self.heaters)
+        except ValueError as err:
+            _LOGGER.warning("Ignoring invalid heater valves: %s", err)
+            return {}
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities and count how many wrote a changed state."""
+        self.states_written = 0
+        self.states_skipped = 0
+        super().async_update_listeners()
+
+    @callback
+    def async_start_effort_tracking(self) -> CALLBACK_TYPE:
+        """Subscribe to heater and valve state changes and return the unsubscribe callback."""
+        unsubscribe = self._hub.async_subscribe(
+            [*self.heaters, *self._valve_heaters], self._async_heater_state_changed
+        )
+        self._refresh_effort_rates(self._clock())
+        return unsubscribe
+
+    @callback
+    def _async_heater_state_changed(self, entity_id: str, when: datetime) -> None:
+        """Close the running effort segment of a heater whose state or valve changed."""
+        if entity_id in self.data:
+            self._set_effort_rate(entity_id, when)
+        for heater_entity_id in self._valve_heaters.get(entity_id, ()):
+            self._set_effort_rate(heater_entity_id, when)
+
+    @callback
+    def async_start_statistics_export(self) -> CALLBACK_TYPE:
+        """Import completed hours into long-term statistics every hour."""
+        return async_track_utc_time_change(
+            self.hass, self._async_export_statistics, minute=0, second=10
+        )
+
+    @callback
+    def _async_export_statistics(self, _now: datetime) -> None:
+        """Import the hours completed since the last export."""
+        if self._backfill_lock.locked():
+            # The backfill imports completed hours itself while it rewrites the statistics.
+            return
+        if self._statistics.async_flush(self.gas_unit):
+            self._async_schedule_ledger_save()
+
+    @property
+    def gas_unit(self) -> str:
+        """Return the unit of the gas meter."""
+        reading = self._hub.meter_reading(self.gas_meter_entity_id)
+        unit = None if reading is None else reading.unit
+        if unit is None or unit == "m3":
+            return UnitOfVolume.CUBIC_METERS
+        return unit
+
+    @callback
+    def async_start_meter_tracking(self) -> CALLBACK_TYPE:
+        """Subscribe to gas meter state changes and return the unsubscribe callback."""
+        return self._hub.async_subscribe(
+            [self.gas_meter_entity_id], self._async_gas_meter_changed
+        )
+
+    @callback
+    def _async_gas_meter_changed(self, entity_id: str, when: datetime) -> None:
+        """Distribute a new gas meter reading as soon as it arrives."""
+        if self.meter_update_mode != "state_change" or self._last_sample_time is None:
+            return
+        started = self.metrics.start()
+        reading = self._hub.meter_reading(entity_id)
+        if reading is None:
+            self.metrics.count("meter_read_failures")
+            return
+
+        self._last_sample_time = when
+        self._add_heating_effort(when)
+        distributed = self._process_gas_reading(reading)
+        self._record_cycle(when, reading, distributed)
+        if distributed:
+            # Publishing also reschedules the watchdog refresh.
+            self.async_set_updated_data(self.data)
+        self.metrics.stop("meter_update", started)
+
+    def _refresh_effort_rates(self, now: datetime) -> None:
+        """Restart all effort segments with rates derived from the current states."""
+        started = self.metrics.start()
+        for heater_entity_id in self.data:
+            self._set_effort_rate(heater_entity_id, now)
+        self.metrics.stop("effort_rates", started)
+
+    def _set_effort_rate(self, heater_entity_id: str, when: datetime) -> None:
+        """Start a new effort segment of a heater at the rate of its current state.
+
+        A heater with a valve position entity follows the valve opening while
+        it has a numeric state, weighted like a heating thermostat by the
+        calculation method.
+        """
+        heater_state = self._hub.heater_state(heater_entity_id)
+        valve_entity_id = self.heater_valves.get(heater_entity_id)
+        valve_rate = (
+            None
+            if valve_entity_id is None
+            else valve_effort_rate(self.hass.states.get(valve_entity_id))
+        )
+        rate = (
+            self._effort_rate(heater_state)
+            if valve_rate is None
+            else valve_rate * self._valve_weight(heater_state)
+        )
+        self._effort.set_rate(heater_entity_id, rate, when)
+        self.cycles.set_heater(
+            self._core.index[heater_entity_id],
+            heater_state,
+            rate,
+            valve=valve_rate is not None,
+        )
 
     async def async_update_options(self, updates: dict) -> None:
-        """Persist updated options and refresh runtime configuration."""
-        new_options = {**self.config_entry.options, **updates}
+        """Apply updated options in place and persist them with a short delay."""
+        started = self.metrics.start()
+        self._pending_options.update(updates)
+        self._apply_config()
+        self.async_update_listeners()
+        self._options_debouncer.async_schedule_call()
+        self.metrics.count("options_updates")
+        self.metrics.stop("options_update", started)
+
+    @callback
+    def async_flush_options(self, *_: Any) -> None:
+        """Write pending option changes to the config entry."""
+        self._options_debouncer.async_cancel()
+        if not self._pending_options:
+            return
+        new_options = {**self.config_entry.options, **self._pending_options}
+        self._pending_options = {}
         self.hass.config_entries.async_update_entry(self.config_entry, options=new_options)
+
+    def requires_reload(self) -> bool:
+        """Return whether the config entry changed entities that require a reload."""
+        entry = self.config_entry
+        gas_meter_entity_id = entry.options.get(
+            CONF_GAS_METER_ENTITY, entry.data[CONF_GAS_METER_ENTITY]
+        )
+        heaters = entry.options.get(CONF_HEATERS, entry.data[CONF_HEATERS])
+        instrumentation = bool(
+            entry.options.get(
+                CONF_INSTRUMENTATION,
+                entry.data.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION),
+            )
+        )
+        groups = self._parse_heater_groups(dict(entry.options))
+        valves = self._parse_heater_valves(dict(entry.options))
+        # The diagnostic sensors only exist while instrumentation is enabled and
+        # valve entities are subscribed to once during setup.
+        return (
+            gas_meter_entity_id != self.gas_meter_entity_id
+            or set(heaters) != set(self.heaters)
+            or instrumentation != self.instrumentation
+            or set(groups) - set(heaters) != set(self.groups.names)
+            or set(valves.values()) != set(self._valve_heaters)
+        )
+
+    @callback
+    def async_apply_entry_options(self) -> None:
+        """Apply changed config entry options to the running coordinator."""
         self._apply_config()
         self.async_update_listeners()
-        await self.async_request_refresh()
+
+    @callback
+    def async_handle_stop(self, *_: Any) -> None:
+        """Write pending options and statistics before Home Assistant stops."""
+        self.async_flush_options()
+        self._statistics.async_flush(self.gas_unit, include_current_hour=True)
+
+    async def async_shutdown(self) -> None:
+        """Write pending option changes and the ledger, then stop the coordinator."""
+        self.async_handle_stop()
+        await self._store.async_save(self._ledger_data())
+        await self._journal.async_save(self._journal_data())
+        await super().async_shutdown()
+
+    async def async_load_ledger(self) -> None:
+        """Restore allocation totals and the gas meter baseline in one read."""
+        stored = await self._store.async_load()
+        if stored is None:
+            # Entries created before the ledger existed still keep totals in sensor states.
+            self._restore_from_last_states()
+            return
+
+        for entity_id, heater in stored.get("heaters", {}).items():
+            heater_stats = self.data.get(entity_id)
+            if heater_stats is None:
+                continue
+            heater_stats.total_allocated = max(0.0, float(heater.get("total_allocated", 0.0)))
+            for counter, value in heater.get("periods", {}).items():
+                if counter in PERIOD_COUNTERS:
+                    heater_stats.set_period_total(counter, max(0.0, float(value)))
+            # Ledgers written before costs were accumulated are priced once at the fixed price.
+            heater_stats.total_cost = max(
+                0.0,
+                float(
+                    heater.get("total_cost", heater_stats.total_allocated * self.gas_price)
+                ),
+            )
+            period_costs = heater.get("period_costs", {})
+            for counter in PERIOD_COUNTERS:
+                value = period_costs.get(
+                    counter, heater_stats.period_total(counter) * self.gas_price
+                )
+                heater_stats.set_period_cost(counter, max(0.0, float(value)))
+        self.warm_water_total_allocated = max(
+            0.0, float(stored.get("warm_water_total_allocated", 0.0))
+        )
+        for counter, value in stored.get("warm_water_periods", {}).items():
+            if counter in PERIOD_COUNTERS:
+                self.warm_water_periods[counter] = max(0.0, float(value))
+        for counter, start in stored.get("period_starts", {}).items():
+            if counter in PERIOD_COUNTERS and start is not None:
+                self.period_starts[counter] = dt_util.parse_datetime(start)
+        self.groups.rebuild(self._core.totals, self._core.costs)
+        self._statistics.load(stored.get("statistics", {}))
+
+        gas_meter = stored.get("gas_meter") or {}
+        if gas_meter.get("entity_id") != self.gas_meter_entity_id:
+            return
+        self._last_gas_value = gas_meter.get("value")
+        self._last_gas_time = (
+            None if gas_meter.get("time") is None else dt_util.parse_datetime(gas_meter["time"])
+        )
+
+    async def async_recover(self) -> None:
+        """Rebuild the effort of the time Home Assistant was not running.
+
+        The journal restores the effort window that was open at the last tick.
+        The time after it is replayed from recorder history when available, so
+        the first refresh allocates the downtime gas delta by real heating.
+        """
+        if self._last_gas_time is None:
+            return
+
+        now = self._clock()
+        replay_start = self._last_gas_time
+        journal = await self._journal.async_load() or {}
+        journal_time = (
+            None if journal.get("time") is None else dt_util.parse_datetime(journal["time"])
+        )
+        if journal_time is not None and journal.get("gas_meter") == self._gas_meter_journal():
+            self._restore_journal_effort(journal.get("effort", {}), journal_time)
+            replay_start = max(replay_start, journal_time)
+
+        retention = timedelta(seconds=EFFORT_BUFFER_BUCKET_SECONDS * EFFORT_BUFFER_BUCKETS)
+        replay_start = max(replay_start, now - retention)
+        changes = await async_get_state_changes(
+            self.hass, [*self.data, *self._valve_heaters], replay_start, now
+        )
+        if not changes:
+            return
+
+        rates = RecordedEffortRates(
+            self.data,
+            self.heater_valves,
+            partial(self._state_effort_rate, calculation_method=self.calculation_method),
+            partial(self._state_valve_weight, calculation_method=self.calculation_method),
+        )
+        self._effort.clear()
+        for when, entity_id, state in changes:
+            for heater_entity_id, rate in rates.update(entity_id, state):
+                self._effort.set_rate(heater_entity_id, rate, when)
+
+    async def async_backfill(self, start: datetime, end: datetime) -> dict[str, Any]:
+        """Recalculate the allocation of a period from recorder history.
+
+        The period is rounded down to whole hours and must start within the
+        recorder history. Backfills run one at a time and the hourly statistics
+        export waits for them.
+        """
+        if not recorder_available(self.hass):
+            raise HomeAssistantError("The recorder is required to backfill allocations")
+
+        from homeassistant.components.recorder import get_instance
+
+        start = start.replace(minute=0, second=0, microsecond=0)
+        end = end.replace(minute=0, second=0, microsecond=0)
+        if start >= end:
+            raise HomeAssistantError("The backfill period must contain a completed hour")
+        oldest_ts = get_instance(self.hass).states_manager.oldest_ts
+        if oldest_ts is None or start.timestamp() < oldest_ts:
+            raise HomeAssistantError(
+                "The recorder history does not cover the start of the backfill period"
+            )
+        async with self._backfill_lock:
+            result = await self._async_backfill(start, end)
+        # Hours completed while the backfill ran were not exported.
+        self._async_export_statistics(dt_util.utcnow())
+        return result
+
+    async def _async_backfill(self, start: datetime, end: datetime) -> dict[str, Any]:
+        """Replace the allocation of whole hours from ``start`` to ``end``.
+
+        The history of the gas meter and the heaters is streamed in chunks and
+        replayed in the recorder executor, and its rounds are summed per hour.
+        The gas allocated before in these hours is read from the exported
+        hourly statistics, which are rewritten with the replayed hours. Only
+        the difference is applied to the totals, the costs and the period
+        counters, so gas allocated before and after the period and live while
+        the replay ran is kept. Replaced gas is priced at the replayed price of
+        its hour.
+        """
+        from homeassistant.components.recorder import get_instance
+
+        heaters = list(self._core.heaters)
+        replay = self._create_replay(
+            self.calculation_method,
+            self.heater_areas,
+            self.heater_outputs,
+            self.include_warm_water,
+            self.warm_water_percent,
+        )
+        hourly_gas: dict[datetime, array] = {}
+        hourly_costs: dict[datetime, array] = {}
+        hourly_warm_water: dict[datetime, float] = {}
+        rounds = 0
+
+        def _collect(
+            _previous: datetime,
+            when: datetime,
+            _delta: float,
+            warm_water: float,
+            shares: Sequence[float],
+            price: float,
+        ) -> None:
+            nonlocal rounds
+            if when >= end:
+                return
+            rounds += 1
+            hour = when.replace(minute=0, second=0, microsecond=0)
+            hourly_warm_water[hour] = hourly_warm_water.get(hour, 0.0) + warm_water
+            if not len(shares):
+                return
+            costs = [share * price for share in shares]
+            if hour in hourly_gas:
+                hourly_gas[hour] = array("d", map(add, hourly_gas[hour], shares))
+                hourly_costs[hour] = array("d", map(add, hourly_costs[hour], costs))
+            else:
+                hourly_gas[hour] = array("d", shares)
+                hourly_costs[hour] = array("d", costs)
+
+        replay.on_round = _collect
+        entity_ids = self._replay_entity_ids()
+        await get_instance(self.hass).async_add_executor_job(
+            lambda: replay.run(iter_state_changes(self.hass, entity_ids, start, end))
+        )
+
+        heater_hours = {
+            entity_id: {hour: gas[index] for hour, gas in hourly_gas.items()}
+            for index, entity_id in enumerate(heaters)
+        }
+        old_heater_hours, old_warm_water_hours = await self._statistics.async_replace(
+            self.gas_unit, start, end, heater_hours, hourly_warm_water
+        )
+
+        # Old gas of an hour without replayed gas is priced like the hour before it.
+        prices: dict[datetime, float] = {}
+        price = next(
+            (
+                sum(hourly_costs[hour]) / total
+                for hour, gas in sorted(hourly_gas.items())
+                if (total := sum(gas)) > 0
+            ),
+            self._current_gas_price(),
+        )
+        hours = hourly_gas.keys() | {
+            hour for old_hours in old_heater_hours.values() for hour in old_hours
+        }
+        for hour in sorted(hours):
+            if (total := sum(hourly_gas.get(hour, ()))) > 0:
+                price = sum(hourly_costs[hour]) / total
+            prices[hour] = price
+
+        for index, entity_id in enumerate(heaters):
+            stats = self.data.get(entity_id)
+            if stats is None:
+                continue
+            old_hours = old_heater_hours.get(entity_id, {})
+            gas_deltas: dict[datetime, float] = {}
+            cost_deltas: dict[datetime, float] = {}
+            for hour in heater_hours[entity_id].keys() | old_hours.keys():
+                old_gas = old_hours.get(hour, 0.0)
+                gas_deltas[hour] = heater_hours[entity_id].get(hour, 0.0) - old_gas
+                cost_deltas[hour] = (
+                    hourly_costs[hour][index] if hour in hourly_costs else 0.0
+                ) - old_gas * prices[hour]
+            stats.total_allocated += sum(gas_deltas.values())
+            stats.total_cost += sum(cost_deltas.values())
+            for counter, counter_start in self.period_starts.items():
+                if counter_start is None:
+                    continue
+                stats.set_period_total(
+                    counter,
+                    stats.period_total(counter)
+                    + sum(delta for hour, delta in gas_deltas.items() if hour >= counter_start),
+                )
+                stats.set_period_cost(
+                    counter,
+                    stats.period_cost(counter)
+                    + sum(delta for hour, delta in cost_deltas.items() if hour >= counter_start),
+                )
+        warm_water_deltas = {
+            hour: hourly_warm_water.get(hour, 0.0) - old_warm_water_hours.get(hour, 0.0)
+            for hour in hourly_warm_water.keys() | old_warm_water_hours.keys()
+        }
+        self.warm_water_total_allocated += sum(warm_water_deltas.values())
+        for counter, counter_start in self.period_starts.items():
+            if counter_start is not None:
+                self.warm_water_periods[counter] += sum(
+                    delta for hour, delta in warm_water_deltas.items() if hour >= counter_start
+                )
+        self.groups.rebuild(self._core.totals, self._core.costs)
+        self._async_schedule_ledger_save()
+        self.async_update_listeners()
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "rounds": rounds,
+            "heaters": {
+                entity_id: sum(hours.values()) for entity_id, hours in heater_hours.items()
+            },
+            "costs": {
+                entity_id: sum(costs[index] for costs in hourly_costs.values())
+                for index, entity_id in enumerate(heaters)
+            },
+            "warm_water": sum(hourly_warm_water.values()),
+        }
+
+    async def async_simulate(
+        self, start: datetime, end: datetime, candidate: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Compare all calculation methods over recorder history.
+
+        Every method is replayed with the current settings and, if given, with
+        the candidate settings. The history is streamed in chunks in one pass
+        in the recorder executor and every state change is fed to all replays,
+        each with its own allocation core, so the live totals are never touched.
+        """
+        if not recorder_available(self.hass):
+            raise HomeAssistantError("The recorder is required to simulate allocations")
+
+        from homeassistant.components.recorder import get_instance
+
+        settings: dict[str, dict[str, Any]] = {
+            "current": {
+                CONF_HEATER_AREAS: self.heater_areas,
+                CONF_HEATER_OUTPUTS: self.heater_outputs,
+                CONF_INCLUDE_WARM_WATER: self.include_warm_water,
+                CONF_WARM_WATER_PERCENT: self.warm_water_percent,
+            }
+        }
+        if candidate:
+            settings["candidate"] = {
+                CONF_HEATER_AREAS: self._sanitize_heater_mapping(
+                    {**self.heater_areas, **candidate.get(CONF_HEATER_AREAS, {})}
+                ),
+                CONF_HEATER_OUTPUTS: self._sanitize_heater_mapping(
+                    {**self.heater_outputs, **candidate.get(CONF_HEATER_OUTPUTS, {})}
+                ),
+                CONF_INCLUDE_WARM_WATER: bool(
+                    candidate.get(CONF_INCLUDE_WARM_WATER, self.include_warm_water)
+                ),
+                CONF_WARM_WATER_PERCENT: self._sanitize_warm_water_percent(
+                    candidate.get(CONF_WARM_WATER_PERCENT, self.warm_water_percent)
+                ),
+            }
+
+        scenarios = [
+            (name, method, self._create_replay(method, **values))
+            for name, values in settings.items()
+            for method in CALCULATION_METHODS
+        ]
+        replays = [replay for _, _, replay in scenarios]
+        entity_ids = self._replay_entity_ids()
+
+        def _simulate() -> None:
+            for when, entity_id, state in iter_state_changes(
+                self.hass, entity_ids, start, end
+            ):
+                for replay in replays:
+                    replay.state_changed(when, entity_id, state)
+
+        await get_instance(self.hass).async_add_executor_job(_simulate)
+
+        result: dict[str, Any] = {"rounds": 0, "scenarios": {}}
+        for name, method, replay in scenarios:
+            result["rounds"] = replay.rounds
+            result["scenarios"].setdefault(name, {})[method] = {
+                "heaters": replay.totals(),
+                "warm_water": replay.warm_water_total_allocated,
+            }
+        return result
+
+    async def async_export(
+        self,
+        start: datetime,
+        end: datetime,
+        path: Path,
+        heaters: list[str],
+        period: str,
+    ) -> dict[str, Any]:
+        """Write the replayed allocation of a period as CSV billing rows.
+
+        The history is streamed in chunks through a replay with the current
+        settings in the recorder executor, and rows are written per billing
+        period as the replay goes, so the live totals are never touched.
+        """
+        if not recorder_available(self.hass):
+            raise HomeAssistantError("The recorder is required to export allocations")
+
+        from homeassistant.components.recorder import get_instance
+
+        replay = self._create_replay(
+            self.calculation_method,
+            self.heater_areas,
+            self.heater_outputs,
+            self.include_warm_water,
+            self.warm_water_percent,
+        )
+        export = BillingExport(
+            path,
+            self._core.heaters,
+            heaters or self._core.heaters,
+            period,
+            include_warm_water=not heaters,
+        )
+        entity_ids = self._replay_entity_ids()
+
+        def _export() -> None:
+            with export:
+                replay.on_round = export.add_round
+                replay.run(iter_state_changes(self.hass, entity_ids, start, end))
+
+        await get_instance(self.hass).async_add_executor_job(_export)
+        return {"path": str(path), "rounds": replay.rounds, "rows": export.rows}
+
+    def _create_replay(
+        self,
+        calculation_method: str,
+        heater_areas: dict[str, float],
+        heater_outputs: dict[str, float],
+        include_warm_water: bool,
+        warm_water_percent: float,
+    ) -> AllocationReplay:
+        """Return a replay of the configured heaters with the given settings."""
+        return AllocationReplay(
+            self._core.heaters,
+            (
+                heater_areas.get(entity_id, 1.0) * heater_outputs.get(entity_id, 1.0)
+                for entity_id in self._core.heaters
+            ),
+            self.gas_meter_entity_id,
+            partial(self._state_effort_rate, calculation_method=calculation_method),
+            partial(
+                self._distributable_gas,
+                include_warm_water=include_warm_water,
+                warm_water_percent=warm_water_percent,
+            ),
+            self.gas_price,
+            self.gas_price_entity_id,
+            self.heater_valves,
+            partial(self._state_valve_weight, calculation_method=calculation_method),
+        )
+
+    def _replay_entity_ids(self) -> list[str]:
+        """Return the entities whose history drives a replay."""
+        entity_ids = [self.gas_meter_entity_id, *self._core.heaters, *self._valve_heaters]
+        if self.gas_price_entity_id is not None:
+            entity_ids.append(self.gas_price_entity_id)
+        return entity_ids
+
+    def _restore_journal_effort(self, effort: dict[str, float], journal_time: datetime) -> None:
+        """Credit the journaled effort window between the baseline and the journal time."""
+        start = self._last_gas_time.timestamp()
+        end = journal_time.timestamp()
+        if end <= start:
+            return
+
+        for entity_id, value in effort.items():
+            index = self._core.index.get(entity_id)
+            if index is None or value <= 0:
+                continue
+            self._core.effort[index] += value
+            self._effort_buffer.add(index, start, end, value / (end - start))
+
+    def _last_restored_value(self, domain: str, unique_id: str) -> float | None:
+        """Return the numeric last state of one of the entry's entities."""
+        entity_id = er.async_get(self.hass).async_get_entity_id(domain, DOMAIN, unique_id)
+        if entity_id is None:
+            return None
+        stored_state = async_get_restore_data(self.hass).last_states.get(entity_id)
+        if stored_state is None:
+            return None
+        try:
+            return float(stored_state.state.state)
+        except (TypeError, ValueError):
+            return None
+
+    def _restore_from_last_states(self) -> None:
+        """Seed allocation totals from the last known states of the gas sensors."""
+        entry_id = self.config_entry.entry_id
+        for entity_id, heater_stats in self.data.items():
+            value = self._last_restored_value("sensor", f"{entry_id}_{entity_id}_allocated_gas")
+            if value is not None:
+                heater_stats.total_allocated = max(0.0, value)
+            value = self._last_restored_value("sensor", f"{entry_id}_{entity_id}_allocated_cost")
+            if value is not None:
+                heater_stats.total_cost = max(0.0, value)
+        value = self._last_restored_value("sensor", f"{entry_id}_warm_water_allocated_gas")
+        if value is not None:
+            self.warm_water_total_allocated = max(0.0, value)
+        self.groups.rebuild(self._core.totals, self._core.costs)
+
+    @callback
+    def async_restore_settings(self) -> None:
+        """Take settings missing from the options from the last number states.
+
+        All number entities are restored in one pass before they are added, so
+        setup applies the configuration once and never writes options or
+        reloads; the restored values are written once after a short delay.
+        """
+        entry = self.config_entry
+        entry_id = entry.entry_id
+        updates: dict[str, Any] = {}
+        for key, unique_id, digits in (
+            (CONF_WARM_WATER_PERCENT, f"{entry_id}_warm_water_percent", 2),
+            (CONF_GAS_PRICE, f"{entry_id}_gas_price", 4),
+        ):
+            if key in entry.options:
+                continue
+            value = self._last_restored_value("number", unique_id)
+            if value is not None:
+                updates[key] = round(value, digits)
+
+        for key, configured, suffix, digits in (
+            (CONF_HEATER_AREAS, self.heater_areas, "heated_area", 2),
+            (CONF_HEATER_OUTPUTS, self.heater_outputs, "heater_output", 1),
+        ):
+            restored = {}
+            for heater_entity_id in self.heaters:
+                if heater_entity_id in configured:
+                    continue
+                value = self._last_restored_value(
+                    "number", f"{entry_id}_{heater_entity_id}_{suffix}"
+                )
+                if value is not None and value > 0:
+                    restored[heater_entity_id] = round(value, digits)
+            if restored:
+                updates[key] = {**configured, **restored}
+
+        if not updates:
+            return
+        self._pending_options.update(updates)
+        self._apply_config()
+        self._options_debouncer.async_schedule_call()
+
+    @callback
+    def _async_schedule_ledger_save(self) -> None:
+        """Coalesce ledger changes into one delayed write."""
+        self._store.async_delay_save(self._ledger_data, STORAGE_SAVE_DELAY_SECONDS)
+
+    def _journal_data(self) -> dict[str, Any]:
+        """Return the open effort window in its journal format."""
+        return {
+            "time": None
+            if self._last_sample_time is None
+            else self._last_sample_time.isoformat(),
+            "gas_meter": self._gas_meter_journal(),
+            "effort": {
+                entity_id: stats.effort_window for entity_id, stats in self.data.items()
+            },
+        }
+
+    def _gas_meter_journal(self) -> dict[str, Any]:
+        """Return the gas meter baseline in its storage format."""
+        return {
+            "entity_id": self.gas_meter_entity_id,
+            "value": self._last_gas_value,
+            "time": None if self._last_gas_time is None else self._last_gas_time.isoformat(),
+        }
+
+    def _ledger_data(self) -> dict[str, Any]:
+        """Return the allocation ledger in its storage format."""
+        return {
+            "heaters": {
+                entity_id: {
+                    "total_allocated": stats.total_allocated,
+                    "periods": {
+                        counter: stats.period_total(counter) for counter in PERIOD_COUNTERS
+                    },
+                    "total_cost": stats.total_cost,
+                    "period_costs": {
+                        counter: stats.period_cost(counter) for counter in PERIOD_COUNTERS
+                    },
+                }
+                for entity_id, stats in self.data.items()
+            },
+            "warm_water_total_allocated": self.warm_water_total_allocated,
+            "warm_water_periods": self.warm_water_periods,
+            "period_starts": {
+                counter: None if start is None else start.isoformat()
+                for counter, start in self.period_starts.items()
+            },
+            "gas_meter": self._gas_meter_journal(),
+            "statistics": self._statistics.as_dict(),
+        }
 
     @staticmethod
     def _sanitize_warm_water_percent(value: Any) -> float:
@@ -168,144 +1013,209 @@ class HeatCalculatorCoordinator(DataUpdateCoordinator[dict[str, HeaterStats]]):
 
     async def _async_update_data(self) -> dict[str, HeaterStats]:
         """Collect heating effort and distribute gas increments."""
-        now = dt_util.utcnow()
+        started = self.metrics.start()
+        now = self._clock()
 
-        if self._last_sample_time is None:
-            self._last_sample_time = now
-            self._last_gas_value = self._read_gas_meter()
-            return self.data
-
-        elapsed_seconds = (now - self._last_sample_time).total_seconds()
+        if self._last_sample_time is not None:
+            self._add_heating_effort(now)
         self._last_sample_time = now
+        self._roll_periods(now)
+        reading = self._read_gas_meter()
+        distributed = self._process_gas_reading(reading)
+        self._record_cycle(now, reading, distributed)
+
+        if self.metrics.enabled:
+            self.metrics.gauge(
+                "missing_heater_states",
+                sum(self._hub.heater_state(entity_id) is None for entity_id in self.heaters),
+            )
+        self.metrics.stop("refresh", started)
+        return self.data
+
+    def _read_gas_meter(self) -> MeterReading | None:
+        """Return the current gas meter reading."""
+        started = self.metrics.start()
+        reading = self._hub.meter_reading(self.gas_meter_entity_id)
+        self.metrics.stop("meter_read", started)
+        return reading
 
-        if elapsed_seconds > 0:
-            self._add_heating_effort(elapsed_seconds)
+    def _current_gas_price(self) -> float:
+        """Return the gas price in effect now.
 
-        current_gas = self._read_gas_meter()
-        if current_gas is None:
-            return self.data
+        The price entity wins while it has a numeric state, otherwise the fixed
+        gas price applies.
+        """
+        if self.gas_price_entity_id is None:
+            return self.gas_price
+        reading = self._hub.meter_reading(self.gas_price_entity_id)
+        if reading is None:
+            return self.gas_price
+        return max(0.0, reading.value)
+
+    def _roll_periods(self, now: datetime) -> None:
+        """Reset the period counters whose local day, month or year has ended."""
+        if self._periods_end is not None and now < self._periods_end:
+            return
+        for counter, period in PERIOD_COUNTERS.items():
+            start = period_start(now, period)
+            if start != self.period_starts[counter]:
+                self.period_starts[counter] = start
+                self._core.reset_period(counter)
+                self.warm_water_periods[counter] = 0.0
+        # The day is the shortest period, so nothing can roll over before it ends.
+        self._periods_end = period_end(self.period_starts["daily"], "day")
+
+    def _record_cycle(
+        self, when: datetime, reading: MeterReading | None, distributed: bool
+    ) -> None:
+        """Add the meter reading and shares of a cycle to the trace."""
+        self.cycles.record(
+            when,
+            None if reading is None else reading.value,
+            self.last_delta_gas if distributed else 0.0,
+            self.last_shares if distributed else (),
+        )
+
+    def _process_gas_reading(self, reading: MeterReading | None) -> bool:
+        """Distribute the increase since the last reading and return whether gas was allocated."""
+        if reading is None:
+            self.metrics.count("meter_read_failures")
+            return False
 
+        current_gas = reading.value
+        # The reading was taken when the value last changed, not when it was polled.
+        reading_time = reading.last_changed
         if self._last_gas_value is None:
             self._last_gas_value = current_gas
-            return self.data
+            self._last_gas_time = reading_time
+            self._async_schedule_ledger_save()
+            return False
 
         delta = current_gas - self._last_gas_value
         if delta > 0:
-            self._distribute_gas(delta)
+            started = self.metrics.start()
+            self._distribute_gas(delta, self._last_gas_time, reading_time)
+            self.metrics.stop("distribute", started)
             self._last_gas_value = current_gas
-        elif delta < 0:
+            self._last_gas_time = reading_time
+            self._async_schedule_ledger_save()
+            return True
+        if delta < 0:
+            self.metrics.count("meter_resets")
             # Meter resets are handled by syncing the baseline to the new value.
             self._last_gas_value = current_gas
+            self._last_gas_time = reading_time
+            self._async_schedule_ledger_save()
 
-        return self.data
-
-    def _read_gas_meter(self) -> float | None:
-        """Read the current gas meter state as float."""
-        state = self.hass.states.get(self.gas_meter_entity_id)
-        if state is None:
-            return None
-
-        try:
-            return float(state.state)
-        except (TypeError, ValueError):
-            return None
+        return False
 
-    def _add_heating_effort(self, elapsed_seconds: float) -> None:
-        """Update each heater's effort based on current runtime and method."""
-        for heater_entity_id, heater_stats in self.data.items():
-            state = self.hass.states.get(heater_entity_id)
-            if state is None:
-                continue
+    def _add_heating_effort(self, now: datetime) -> None:
+        """Credit the open effort segments of all heaters up to now."""
+        self._effort.close_segments(now)
+        self._journal.async_delay_save(self._journal_data, JOURNAL_SAVE_DELAY_SECONDS)
 
-            if not self._is_heating_active(state.state, state.attributes):
-                continue
+    def _credit_effort(
+        self, heater_entity_id: str, start: datetime, end: datetime, rate: float
+    ) -> None:
+        """Add a closed heating interval to the heater's effort window."""
+        index = self._core.index.get(heater_entity_id)
+        if index is None:
+            return
+        self._core.effort[index] += (end - start).total_seconds() * rate
+        self._effort_buffer.add(index, start.timestamp(), end.timestamp(), rate)
 
-            effort_factor = 1.0
-            if self.calculation_method == "runtime_temp_weighted":
-                effort_factor = self._temperature_weight(state.attributes)
+    def _effort_rate(self, heater_state: HeaterState | None) -> float:
+        """Return the unweighted effort per second of a parsed heater state."""
+        if heater_state is None:
+            return 0.0
+        return heater_state.effort_rate(self.calculation_method)
 
-            heater_stats.effort_window += (
-                elapsed_seconds
-                * effort_factor
-                * self._heater_area_factor(heater_entity_id)
-                * self._heater_output_factor(heater_entity_id)
-            )
+    def _valve_weight(self, heater_state: HeaterState | None) -> float:
+        """Return the factor applied to the valve opening of a parsed heater state."""
+        if heater_state is None:
+            return 1.0
+        return heater_state.valve_weight(self.calculation_method)
 
     @staticmethod
-    def _is_heating_active(state_value: str, attributes: dict) -> bool:
-        """Estimate whether a thermostat is currently heating."""
-        hvac_action = attributes.get("hvac_action")
-        if hvac_action == "heating":
-            return True
-
-        if state_value != "heat":
-            return False
-
-        current_temperature = attributes.get("current_temperature")
-        target_temperature = attributes.get("temperature")
-        if current_temperature is None or target_temperature is None:
-            return False
-
-        try:
-            return float(current_temperature) < float(target_temperature)
-        except (TypeError, ValueError):
-            return False
+    def _state_effort_rate(state: State | None, calculation_method: str) -> float:
+        """Return the unweighted effort per second of a climate state."""
+        heater_state = HeaterState.from_state(state)
+        if heater_state is None:
+            return 0.0
+        return heater_state.effort_rate(calculation_method)
 
     @staticmethod
-    def _temperature_weight(attributes: dict[str, Any]) -> float:
-        """Return a weighting factor derived from target/current temperature."""
-        current_temperature = attributes.get("current_temperature")
-        target_temperature = attributes.get("temperature")
-        if current_temperature is None or target_temperature is None:
+    def _state_valve_weight(state: State | None, calculation_method: str) -> float:
+        """Return the factor applied to the valve opening of a climate state."""
+        heater_state = HeaterState.from_state(state)
+        if heater_state is None:
             return 1.0
+        return heater_state.valve_weight(calculation_method)
 
-        try:
-            delta = float(target_temperature) - float(current_temperature)
-        except (TypeError, ValueError):
-            return 1.0
+    @staticmethod
+    def _distributable_gas(
+        delta_gas: float, include_warm_water: bool, warm_water_percent: float
+    ) -> float:
+        """Return the part of a gas delta left for the heaters after warm water."""
+        if not include_warm_water:
+            return delta_gas
+        return delta_gas * (1 - (warm_water_percent / 100.0))
 
-        return max(0.5, min(3.0, 1.0 + max(delta, 0.0) * 0.25))
+    def _distribute_gas(
+        self,
+        delta_gas: float,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> None:
+        """Distribute a gas meter delta to all configured heaters.
 
-    def _distribute_gas(self, delta_gas: float) -> None:
-        """Distribute a gas meter delta to all configured heaters."""
+        When the timestamps of both meter readings are known, the delta is split
+        by the effort recorded between them instead of the current effort window.
+        """
         if not self.data:
             self.last_delta_gas = delta_gas
             self.last_distributable_gas = 0.0
             self.last_warm_water_deducted = 0.0
-            self.last_distribution_time = dt_util.utcnow()
+            self.last_distribution_time = self._clock()
+            self.last_shares = ()
             return
 
-        distributable = delta_gas
+        distributable = self._distributable_gas(
+            delta_gas, self.include_warm_water, self.warm_water_percent
+        )
         self.last_delta_gas = delta_gas
-        if self.include_warm_water:
-            distributable = delta_gas * (1 - (self.warm_water_percent / 100.0))
         self.last_distributable_gas = distributable
         self.last_warm_water_deducted = max(delta_gas - distributable, 0.0)
+        self.last_distribution_time = self._clock()
+        self._roll_periods(self.last_distribution_time)
+        self.last_gas_price = self._current_gas_price()
         if self.last_warm_water_deducted > 0:
             self.warm_water_total_allocated += self.last_warm_water_deducted
-        self.last_distribution_time = dt_util.utcnow()
+            for counter in self.warm_water_periods:
+                self.warm_water_periods[counter] += self.last_warm_water_deducted
 
         if distributable <= 0:
-            self._reset_effort_window()
-            return
-
-        total_effort = sum(stats.effort_window for stats in self.data.values())
-
-        if total_effort <= 0:
-            # If no heating runtime was seen, distribute equally as a fallback.
-            equal_share = distributable / len(self.data)
-            for stats in self.data.values():
-                stats.total_allocated += equal_share
-            self._reset_effort_window()
+            self._core.reset_effort()
+            self.last_shares = ()
+            self.rounds.append(
+                self.last_distribution_time, delta_gas, self.last_warm_water_deducted, ()
+            )
+            self._statistics.record(
+                self.last_distribution_time, {}, self.last_warm_water_deducted
+            )
             return
 
-        for stats in self.data.values():
-            ratio = stats.effort_window / total_effort
-            stats.total_allocated += distributable * ratio
-
-        self._reset_effort_window()
-
-    def _reset_effort_window(self) -> None:
-        """Clear temporary effort values after a gas allocation round."""
-        for stats in self.data.values():
-            stats.effort_window = 0.0
+        efforts = None
+        if start is not None and end is not None and start < end:
+            efforts = self._effort_buffer.effort_between(start.timestamp(), end.timestamp())
+        shares = self._core.distribute(distributable, efforts, self.last_gas_price)
+        self.groups.add(shares, self.last_gas_price)
+        self.last_shares = shares
+        self.rounds.append(
+            self.last_distribution_time, delta_gas, self.last_warm_water_deducted, shares
+        )
+        self._statistics.record(
+            self.last_distribution_time,
+            dict(zip(self._core.heaters, map(float, shares))),
+            self.last_warm_water_deducted,
+        )
@@ -0,0 +1,128 @@
+"""Bounded trace of recent refresh cycles for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+import math
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import CYCLE_TRACE_MAX_CYCLES, CYCLE_TRACE_MAX_VALUES
+from .hub import HeaterState
+
+HEATING_REASONS = ("missing", "idle", "hvac_action", "below_target", "valve")
+_REASON_CODES = {None: 1, "hvac_action": 2, "below_target": 3}
+_VALVE_CODE = 4
+
+
+class CycleTrace:
+    """Ring buffer of the last refresh cycles in a compact encoding.
+
+    A cycle is stored as one tuple with its timestamp, the seconds since the
+    previous cycle, the gas meter value and the distributed delta, followed by
+    one heating reason byte per heater and ``array('f')`` vectors of effort
+    rates and shares. Heater reasons and rates are kept current by
+    ``set_heater`` as states change, so recording a cycle only copies them.
+    Heaters are addressed by their position in ``heaters`` and the number of
+    cycles kept shrinks with the heater count, so the buffer holds at most
+    about ``CYCLE_TRACE_MAX_VALUES`` per-heater values.
+    """
+
+    def __init__(self, heaters: Sequence[str], capacity: int | None = None) -> None:
+        """Initialize an empty trace for the given heaters."""
+        self.heaters = list(heaters)
+        self.size = len(self.heaters)
+        if capacity is None:
+            capacity = min(
+                CYCLE_TRACE_MAX_CYCLES, max(1, CYCLE_TRACE_MAX_VALUES // max(self.size, 1))
+            )
+        self.capacity = capacity
+        self.weights = array("f", [1.0] * self.size)
+        self._reasons = bytearray(self.size)
+        self._rates = array("f", bytes(4 * self.size))
+        self._cycles: deque[tuple[Any, ...]] = deque(maxlen=capacity)
+        self._last_time: float | None = None
+
+    def __len__(self) -> int:
+        """Return the number of cycles kept."""
+        return len(self._cycles)
+
+    def set_weights(self, weights: Iterable[float]) -> None:
+        """Store the configured per-heater weights shown with the cycles."""
+        self.weights = array("f", weights)
+
+    def set_heater(
+        self,
+        index: int,
+        heater_state: HeaterState | None,
+        rate: float,
+        valve: bool = False,
+    ) -> None:
+        """Update the heating reason and effort rate of a heater.
+
+        ``valve`` marks a rate taken from the heater's valve position.
+        """
+        if valve:
+            self._reasons[index] = _VALVE_CODE if rate > 0 else _REASON_CODES[None]
+        else:
+            self._reasons[index] = (
+                0 if heater_state is None else _REASON_CODES[heater_state.reason]
+            )
+        self._rates[index] = rate
+
+    def record(
+        self,
+        when: datetime,
+        meter_value: float | None,
+        delta_gas: float,
+        shares: Sequence[float] = (),
+    ) -> None:
+        """Add a cycle, dropping the oldest one once the trace is full."""
+        timestamp = when.timestamp()
+        elapsed = 0.0 if self._last_time is None else timestamp - self._last_time
+        self._last_time = timestamp
+        self._cycles.append(
+            (
+                timestamp,
+                elapsed,
+                math.nan if meter_value is None else meter_value,
+                delta_gas,
+                bytes(self._reasons),
+                self._rates[:],
+                array("f", shares) if len(shares) == self.size else None,
+            )
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the decoded cycles for diagnostics, oldest first."""
+        return {
+            "heaters": self.heaters,
+            "weights": [round(weight, 6) for weight in self.weights],
+            "capacity": self.capacity,
+            "cycles": [
+                {
+                    "time": dt_util.utc_from_timestamp(timestamp).isoformat(),
+                    "elapsed": round(elapsed, 3),
+                    "meter_value": None if math.isnan(meter_value) else meter_value,
+                    "delta_gas": delta_gas,
+                    "heating": [HEATING_REASONS[code] for code in reasons],
+                    "rates": [round(rate, 6) for rate in rates],
+                    "shares": None
+                    if shares is None
+                    else [round(share, 6) for share in shares],
+                }
+                for (
+                    timestamp,
+                    elapsed,
+                    meter_value,
+                    delta_gas,
+                    reasons,
+                    rates,
+                    shares,
+                ) in self._cycles
+            ],
+        }
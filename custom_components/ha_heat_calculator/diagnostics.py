@@ -9,6 +9,7 @@ from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN
 from .coordinator import HeatCalculatorCoordinator
+from .hub import async_get_state_hub
 
 
 def _snapshot_heater_state(
@@ -16,7 +17,9 @@ def _snapshot_heater_state(
 ) -> dict[str, Any]:
     """Capture key heater state details for diagnostics."""
     state = coordinator.hass.states.get(entity_id)
-    if state is None:
+    # The hub keeps the parsed heater states the coordinator allocates with.
+    heater_state = async_get_state_hub(coordinator.hass).heater_state(entity_id)
+    if state is None or heater_state is None:
         return {
             "entity_id": entity_id,
             "state": None,
@@ -29,10 +32,12 @@ def _snapshot_heater_state(
     return {
         "entity_id": entity_id,
         "state": state.state,
-        "is_heating": coordinator._is_heating_active(state.state, state.attributes),
-        "hvac_action": state.attributes.get("hvac_action"),
-        "current_temperature": state.attributes.get("current_temperature"),
-        "target_temperature": state.attributes.get("temperature"),
+        "is_heating": heater_state.heating,
+        "heating_reason": heater_state.reason,
+        "temperature_weight": heater_state.temperature_weight,
+        "hvac_action": heater_state.hvac_action,
+        "current_temperature": heater_state.current_temperature,
+        "target_temperature": heater_state.target_temperature,
     }
 
 
@@ -60,8 +65,11 @@ async def async_get_config_entry_diagnostics(
             "include_warm_water": coordinator.include_warm_water,
             "warm_water_percent": coordinator.warm_water_percent,
             "gas_price": coordinator.gas_price,
+            "gas_price_entity_id": coordinator.gas_price_entity_id,
+            "last_gas_price": coordinator.last_gas_price,
             "heater_areas": coordinator.heater_areas,
             "heater_outputs": coordinator.heater_outputs,
+            "heater_valves": coordinator.heater_valves,
             "last_delta_gas": coordinator.last_delta_gas,
             "last_distributable_gas": coordinator.last_distributable_gas,
             "last_warm_water_deducted": coordinator.last_warm_water_deducted,
@@ -69,6 +77,12 @@ async def async_get_config_entry_diagnostics(
             if coordinator.last_distribution_time
             else None,
         },
+        "publishing": {
+            "states_written": coordinator.states_written,
+            "states_skipped": coordinator.states_skipped,
+        },
+        "instrumentation": coordinator.metrics.as_dict(),
+        "cycles": coordinator.cycles.as_dict(),
         "allocation": {
             "effort_window": {
                 entity_id: stats.effort_window
@@ -78,5 +92,14 @@ async def async_get_config_entry_diagnostics(
                 entity_id: stats.total_allocated
                 for entity_id, stats in coordinator.data.items()
             },
+            "total_cost": {
+                entity_id: stats.total_cost for entity_id, stats in coordinator.data.items()
+            },
+            "groups": {
+                name: coordinator.groups.total(name) for name in coordinator.groups.names
+            },
+            "group_costs": {
+                name: coordinator.groups.cost(name) for name in coordinator.groups.names
+            },
         },
     }
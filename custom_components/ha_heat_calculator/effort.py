@@ -0,0 +1,261 @@
+"""Event-driven heating effort integration for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import State, valid_entity_id
+
+from .const import EFFORT_BUFFER_BUCKET_SECONDS, EFFORT_BUFFER_BUCKETS
+
+EffortSink = Callable[[str, datetime, datetime, float], None]
+
+
+def parse_valves(valves: Any, heaters: Iterable[str]) -> dict[str, str]:
+    """Return the valve position entity of every heater that has one.
+
+    ``valves`` maps configured heater entity ids to entities reporting the
+    valve opening in percent. Raises ValueError for anything else.
+    """
+    if not valves:
+        return {}
+    if not isinstance(valves, Mapping):
+        raise ValueError("heater valves must map heaters to valve position entities")
+
+    heaters = set(heaters)
+    parsed: dict[str, str] = {}
+    for heater_entity_id, valve_entity_id in valves.items():
+        if heater_entity_id not in heaters:
+            raise ValueError(f"unknown heater {heater_entity_id!r}")
+        if not isinstance(valve_entity_id, str) or not valid_entity_id(valve_entity_id):
+            raise ValueError(
+                f"invalid valve position entity {valve_entity_id!r} of {heater_entity_id!r}"
+            )
+        parsed[heater_entity_id] = valve_entity_id
+    return parsed
+
+
+def valve_effort_rate(state: State | None) -> float | None:
+    """Return the effort per second of a valve opening, or None if it is unknown.
+
+    A fully open valve counts like a heater that reports heating. The caller
+    applies the temperature weight of the calculation method.
+    """
+    if state is None:
+        return None
+    try:
+        position = float(state.state)
+    except (TypeError, ValueError):
+        return None
+    return min(max(position, 0.0), 100.0) / 100.0
+
+
+@dataclass(slots=True)
+class OpenSegment:
+    """A heating interval that has started but not been credited yet."""
+
+    start: datetime
+    rate: float
+
+
+class EffortIntegrator:
+    """Integrate per-heater effort rates over exact state change intervals.
+
+    Every heater has exactly one open segment with the effort rate that was
+    valid when the segment started. A new rate closes the segment at the
+    change timestamp and hands the finished interval to ``sink``.
+    """
+
+    def __init__(self, sink: EffortSink) -> None:
+        """Initialize the integrator."""
+        self._sink = sink
+        self._segments: dict[str, OpenSegment] = {}
+
+    def set_rate(self, entity_id: str, rate: float, when: datetime) -> None:
+        """Close the open segment at ``when`` and continue with ``rate``."""
+        segment = self._segments.get(entity_id)
+        if segment is None:
+            self._segments[entity_id] = OpenSegment(start=when, rate=rate)
+            return
+
+        if when > segment.start:
+            if segment.rate > 0:
+                self._sink(entity_id, segment.start, when, segment.rate)
+            segment.start = when
+        segment.rate = rate
+
+    def close_segments(self, when: datetime) -> None:
+        """Credit all open segments up to ``when`` and keep them open."""
+        for entity_id, segment in self._segments.items():
+            if when <= segment.start:
+                continue
+            if segment.rate > 0:
+                self._sink(entity_id, segment.start, when, segment.rate)
+            segment.start = when
+
+    def retain(self, entity_ids: Iterable[str]) -> None:
+        """Drop open segments of heaters that are no longer configured."""
+        keep = set(entity_ids)
+        for entity_id in [key for key in self._segments if key not in keep]:
+            del self._segments[entity_id]
+
+    def clear(self) -> None:
+        """Drop all open segments without crediting them."""
+        self._segments.clear()
+
+    def rate(self, entity_id: str) -> float:
+        """Return the effort rate of the open segment for a heater."""
+        segment = self._segments.get(entity_id)
+        return 0.0 if segment is None else segment.rate
+
+
+class RecordedEffortRates:
+    """Effort rates of heaters derived from recorded climate and valve states.
+
+    Heaters with a valve position entity follow its opening, scaled by
+    ``valve_weight`` of their climate state, while it has a numeric state and
+    their climate state otherwise, so the last state of both is kept while
+    recorded changes are consumed in time order.
+    """
+
+    def __init__(
+        self,
+        heaters: Iterable[str],
+        valves: Mapping[str, str],
+        effort_rate: Callable[[State | None], float],
+        valve_weight: Callable[[State | None], float] | None = None,
+    ) -> None:
+        """Initialize the rates of the given heaters."""
+        self._heaters = set(heaters)
+        self._valves = {
+            heater_entity_id: valve_entity_id
+            for heater_entity_id, valve_entity_id in valves.items()
+            if heater_entity_id in self._heaters
+        }
+        self._valve_heaters: dict[str, list[str]] = {}
+        for heater_entity_id, valve_entity_id in self._valves.items():
+            self._valve_heaters.setdefault(valve_entity_id, []).append(heater_entity_id)
+        self._effort_rate = effort_rate
+        self._valve_weight = valve_weight
+        self._climate_states: dict[str, State | None] = {}
+        self._valve_rates: dict[str, float | None] = {}
+
+    def update(self, entity_id: str, state: State | None) -> list[tuple[str, float]]:
+        """Consume a recorded state and return the new rates of affected heaters."""
+        if entity_id in self._heaters:
+            self._climate_states[entity_id] = state
+            heaters = [entity_id]
+        elif entity_id in self._valve_heaters:
+            self._valve_rates[entity_id] = valve_effort_rate(state)
+            heaters = self._valve_heaters[entity_id]
+        else:
+            return []
+        return [(heater_entity_id, self.rate(heater_entity_id)) for heater_entity_id in heaters]
+
+    def rate(self, heater_entity_id: str) -> float:
+        """Return the current effort rate of a heater."""
+        valve_entity_id = self._valves.get(heater_entity_id)
+        if valve_entity_id is not None:
+            valve_rate = self._valve_rates.get(valve_entity_id)
+            if valve_rate is not None:
+                if self._valve_weight is None:
+                    return valve_rate
+                return valve_rate * self._valve_weight(
+                    self._climate_states.get(heater_entity_id)
+                )
+        return self._effort_rate(self._climate_states.get(heater_entity_id))
+
+
+class EffortRingBuffer:
+    """Time-indexed ring buffer of cumulative per-heater effort.
+
+    Effort is stored as cumulative values at fixed bucket boundaries in one flat
+    ``array('d')`` of ``buckets * size`` doubles, so memory stays bounded and the
+    effort between any two retained timestamps costs O(heaters) to look up.
+    Values inside a bucket are linearly interpolated.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        bucket_seconds: float = EFFORT_BUFFER_BUCKET_SECONDS,
+        buckets: int = EFFORT_BUFFER_BUCKETS,
+    ) -> None:
+        """Initialize an empty buffer for ``size`` heaters."""
+        self.size = size
+        self._width = float(bucket_seconds)
+        self._buckets = buckets
+        self._rows = array("d", bytes(8 * size * buckets))
+        self._total = array("d", bytes(8 * size))
+        self._head: int | None = None
+        self._latest = 0.0
+
+    def add(self, index: int, start: float, end: float, rate: float) -> None:
+        """Credit effort ``rate`` per second for one heater between two timestamps."""
+        if end <= start or rate <= 0:
+            return
+
+        self._advance(int(end // self._width))
+        head = self._head
+        size = self.size
+        self._total[index] += rate * (end - start)
+        self._latest = max(self._latest, end)
+
+        # Boundaries after the segment start include the part burned before them.
+        first = max(int(start // self._width) + 1, head - self._buckets + 1)
+        for bucket in range(first, head + 1):
+            boundary = bucket * self._width
+            offset = (bucket % self._buckets) * size
+            self._rows[offset + index] += rate * (min(boundary, end) - start)
+
+    def effort_between(self, start: float, end: float) -> list[float]:
+        """Return the effort of every heater credited between two timestamps."""
+        upper = self._cumulative(end)
+        lower = self._cumulative(start)
+        return [max(0.0, high - low) for high, low in zip(upper, lower)]
+
+    def _advance(self, bucket: int) -> None:
+        """Open all bucket rows up to ``bucket`` with the running totals."""
+        if self._head is not None and bucket <= self._head:
+            return
+
+        first = bucket if self._head is None else self._head + 1
+        first = max(first, bucket - self._buckets + 1)
+        size = self.size
+        for current in range(first, bucket + 1):
+            offset = (current % self._buckets) * size
+            self._rows[offset : offset + size] = self._total
+        self._head = bucket
+
+    def _row(self, bucket: int) -> array:
+        """Return the cumulative effort stored at a bucket boundary."""
+        offset = (bucket % self._buckets) * self.size
+        return self._rows[offset : offset + self.size]
+
+    def _cumulative(self, when: float) -> list[float] | array:
+        """Return the cumulative effort of every heater at a timestamp."""
+        head = self._head
+        if head is None:
+            return array("d", bytes(8 * self.size))
+
+        bucket = int(when // self._width)
+        oldest = head - self._buckets + 1
+        if bucket < oldest:
+            return self._row(oldest)
+        if bucket > head or when >= self._latest:
+            return self._total
+
+        lower = self._row(bucket)
+        start = bucket * self._width
+        if bucket == head:
+            upper = self._total
+            span = self._latest - start
+        else:
+            upper = self._row(bucket + 1)
+            span = self._width
+        fraction = 0.0 if span <= 0 else (when - start) / span
+        return [low + (high - low) * fraction for low, high in zip(lower, upper)]
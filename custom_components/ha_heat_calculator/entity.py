@@ -0,0 +1,42 @@
+"""Base entity for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import HeatCalculatorCoordinator
+
+
+class HeatCalculatorEntity(CoordinatorEntity[HeatCalculatorCoordinator]):
+    """Coordinator entity that only writes its state when it changed.
+
+    Most refreshes neither distribute gas nor change options, so the rounded
+    state and the attributes are compared with the last written ones first.
+    """
+
+    _written_signature: tuple[Any, ...] | None = None
+
+    def _state_signature(self) -> tuple[Any, ...]:
+        """Return everything that ends up in the state machine."""
+        return (self.available, self.state, self.extra_state_attributes)
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._written_signature = self._state_signature()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if it differs from the last written one."""
+        signature = self._state_signature()
+        if signature == self._written_signature:
+            self.coordinator.states_skipped += 1
+            return
+        self._written_signature = signature
+        self.coordinator.states_written += 1
+        started = self.coordinator.metrics.start()
+        self.async_write_ha_state()
+        self.coordinator.metrics.stop("entity_write", started)
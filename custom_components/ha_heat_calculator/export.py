@@ -0,0 +1,137 @@
+"""CSV billing export of replayed allocations for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+import csv
+from datetime import datetime
+import os
+from pathlib import Path
+from types import TracebackType
+from typing import TextIO
+
+from homeassistant.util import dt as dt_util
+
+from .periods import period_end, period_start
+
+EXPORT_PERIODS = ("round", "hour", "day", "month", "year")
+EXPORT_HEADER = ("period_start", "period_end", "entity_id", "gas", "cost")
+WARM_WATER_ROW = "warm_water"
+
+
+class BillingExport:
+    """Write per-heater consumption and cost per billing period to a CSV file.
+
+    Distribution rounds are summed up for the current period only and the
+    rows of a period are written as soon as a round of a later period arrives,
+    so memory does not grow with the length of the exported range. Costs are
+    summed at the gas price of every round. The file
+    is written next to its destination and moved into place when complete.
+    Must be run in an executor.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        heaters: Sequence[str],
+        selected: Sequence[str],
+        period: str,
+        include_warm_water: bool,
+    ) -> None:
+        """Initialize the export for the selected heaters."""
+        self.path = path
+        self.period = period
+        self.include_warm_water = include_warm_water
+        index = {entity_id: position for position, entity_id in enumerate(heaters)}
+        self._selected = [(entity_id, index[entity_id]) for entity_id in selected]
+        self._sums = array("d", bytes(8 * len(heaters)))
+        self._costs = array("d", bytes(8 * len(heaters)))
+        self._warm_water = 0.0
+        self._warm_water_cost = 0.0
+        self._start: datetime | None = None
+        self._end: datetime | None = None
+        self._file: TextIO | None = None
+        self._writer = None
+        self._partial = path.with_name(f"{path.name}.partial")
+        self.rows = 0
+
+    def __enter__(self) -> BillingExport:
+        """Open the partial file and write the header."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self._partial.open("w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_HEADER)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write the last period and move the file into place, or drop it on errors."""
+        try:
+            if exc_type is None:
+                self._flush()
+        finally:
+            self._file.close()
+        if exc_type is None:
+            os.replace(self._partial, self.path)
+        else:
+            self._partial.unlink(missing_ok=True)
+
+    def add_round(
+        self,
+        start: datetime,
+        end: datetime,
+        delta_gas: float,
+        warm_water: float,
+        shares: Sequence[float],
+        gas_price: float,
+    ) -> None:
+        """Add a distribution round at its gas price to its billing period."""
+        if self.period == "round":
+            self._flush()
+            self._start, self._end = dt_util.as_local(start), dt_util.as_local(end)
+        elif self._end is None or end >= self._end or end < self._start:
+            self._flush()
+            self._start = period_start(end, self.period)
+            self._end = period_end(self._start, self.period)
+
+        self._warm_water += warm_water
+        self._warm_water_cost += warm_water * gas_price
+        sums = self._sums
+        costs = self._costs
+        for index, share in enumerate(shares):
+            sums[index] += share
+            costs[index] += share * gas_price
+
+    def _flush(self) -> None:
+        """Write the rows of the current period and start a new one."""
+        if self._start is None:
+            return
+        period = (self._start.isoformat(), self._end.isoformat())
+        rows = [
+            (*period, entity_id, *self._amounts(self._sums[index], self._costs[index]))
+            for entity_id, index in self._selected
+        ]
+        if self.include_warm_water:
+            rows.append(
+                (
+                    *period,
+                    WARM_WATER_ROW,
+                    *self._amounts(self._warm_water, self._warm_water_cost),
+                )
+            )
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+        self._sums = array("d", bytes(8 * len(self._sums)))
+        self._costs = array("d", bytes(8 * len(self._costs)))
+        self._warm_water = self._warm_water_cost = 0.0
+        self._start = self._end = None
+
+    @staticmethod
+    def _amounts(gas: float, cost: float) -> tuple[float, float]:
+        """Return the rounded gas amount and its cost."""
+        return round(gas, 6), round(cost, 4)
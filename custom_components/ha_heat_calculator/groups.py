@@ -0,0 +1,109 @@
+"""Zone groups of heaters for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+
+def parse_groups(groups: Any, heaters: Iterable[str]) -> dict[str, str | None]:
+    """Return the parent of every group and grouped heater.
+
+    ``groups`` maps a group name to its members, which are configured heater
+    entity ids or other group names. Every member belongs to at most one group
+    and groups must not contain themselves, so the groups form a forest.
+    Raises ValueError for anything else.
+    """
+    if not groups:
+        return {}
+    if not isinstance(groups, Mapping):
+        raise ValueError("heater groups must map group names to members")
+
+    heaters = set(heaters)
+    parents: dict[str, str | None] = {}
+    for name, members in groups.items():
+        if not isinstance(name, str) or not name.strip() or name in heaters:
+            raise ValueError(f"invalid group name {name!r}")
+        parents.setdefault(name, None)
+        if isinstance(members, str) or not isinstance(members, Sequence):
+            raise ValueError(f"members of group {name!r} must be a list")
+        for member in members:
+            if member not in heaters and member not in groups:
+                raise ValueError(f"unknown member {member!r} in group {name!r}")
+            if parents.get(member) is not None:
+                raise ValueError(f"{member!r} belongs to more than one group")
+            parents[member] = name
+
+    for name in groups:
+        seen = {name}
+        parent = parents[name]
+        while parent is not None:
+            if parent in seen:
+                raise ValueError(f"group {name!r} contains itself")
+            seen.add(parent)
+            parent = parents[parent]
+    return parents
+
+
+class ZoneGroups:
+    """Group totals maintained alongside the heater totals.
+
+    Every heater keeps the indices of the groups on its path to the root, so
+    adding the shares of a distribution round costs O(depth) per heater
+    instead of re-summing all members of every group.
+    """
+
+    def __init__(self, parents: Mapping[str, str | None], heaters: Sequence[str]) -> None:
+        """Compile the group paths of the given heaters."""
+        heater_ids = set(heaters)
+        self.names = [name for name in parents if name not in heater_ids]
+        self.index = {name: index for index, name in enumerate(self.names)}
+        self.parents = {name: parents[name] for name in self.names}
+        self.totals = array("d", bytes(8 * len(self.names)))
+        self.costs = array("d", bytes(8 * len(self.names)))
+        self.members: dict[str, list[str]] = {name: [] for name in self.names}
+        self._paths: list[tuple[int, ...]] = []
+        for entity_id in heaters:
+            path = []
+            parent = parents.get(entity_id)
+            while parent is not None:
+                path.append(self.index[parent])
+                self.members[parent].append(entity_id)
+                parent = parents[parent]
+            self._paths.append(tuple(path))
+
+    def __len__(self) -> int:
+        """Return the number of groups."""
+        return len(self.names)
+
+    def add(self, shares: Sequence[float], price: float = 0.0) -> None:
+        """Add the per-heater shares of a round and their cost to their groups."""
+        self._add(shares, (share * price for share in shares))
+
+    def rebuild(
+        self, heater_totals: Sequence[float], heater_costs: Sequence[float]
+    ) -> None:
+        """Recalculate all group totals and costs from the heater accumulators."""
+        self.totals = array("d", bytes(8 * len(self.names)))
+        self.costs = array("d", bytes(8 * len(self.names)))
+        self._add(heater_totals, heater_costs)
+
+    def _add(self, shares: Sequence[float], costs: Iterable[float]) -> None:
+        """Add per-heater amounts and costs along the group paths."""
+        if not self.names:
+            return
+        totals = self.totals
+        group_costs = self.costs
+        for path, share, cost in zip(self._paths, shares, costs):
+            for index in path:
+                totals[index] += share
+                group_costs[index] += cost
+
+    def total(self, name: str) -> float:
+        """Return the allocated gas of a group."""
+        return self.totals[self.index[name]]
+
+    def cost(self, name: str) -> float:
+        """Return the cost of the gas allocated to a group."""
+        return self.costs[self.index[name]]
@@ -0,0 +1,73 @@
+"""Recorder history access for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant, State
+
+from .const import HISTORY_CHUNK_HOURS
+
+
+def recorder_available(hass: HomeAssistant) -> bool:
+    """Return whether the recorder integration is loaded."""
+    return "recorder" in hass.config.components
+
+
+def iter_state_changes(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start: datetime,
+    end: datetime,
+    chunk: timedelta = timedelta(hours=HISTORY_CHUNK_HOURS),
+) -> Iterator[tuple[datetime, str, State]]:
+    """Yield recorded states of entities between two timestamps ordered by time.
+
+    History is read in windows of ``chunk`` so only one window is held in
+    memory. The state valid at ``start`` is included with its timestamp
+    clamped to ``start``. Must be run in the recorder executor.
+    """
+    from homeassistant.components.recorder import history
+
+    # The recorder filters with exclusive bounds; widen the windows so states
+    # exactly on a window boundary or at ``end`` are not skipped.
+    epsilon = timedelta(microseconds=1)
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + chunk, end)
+        first = window_start == start
+        recorded = history.get_significant_states(
+            hass,
+            window_start if first else window_start - epsilon,
+            window_end + epsilon if window_end == end else window_end,
+            entity_ids,
+            include_start_time_state=first,
+            significant_changes_only=False,
+        )
+        changes = [
+            (max(state.last_updated, start), entity_id, state)
+            for entity_id, states in recorded.items()
+            for state in states
+            if isinstance(state, State)
+        ]
+        changes.sort(key=lambda change: change[0])
+        yield from changes
+        window_start = window_end
+
+
+async def async_get_state_changes(
+    hass: HomeAssistant, entity_ids: list[str], start: datetime, end: datetime
+) -> list[tuple[datetime, str, State]]:
+    """Return recorded states of entities between two timestamps ordered by time.
+
+    Without a recorder an empty list is returned.
+    """
+    if not entity_ids or end <= start or not recorder_available(hass):
+        return []
+
+    from homeassistant.components.recorder import get_instance
+
+    return await get_instance(hass).async_add_executor_job(
+        lambda: list(iter_state_changes(hass, entity_ids, start, end))
+    )
@@ -0,0 +1,275 @@
+"""Shared heater and gas meter state tracking for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+DATA_STATE_HUB: HassKey[StateHub] = HassKey(f"{DOMAIN}_state_hub")
+
+StateListener = Callable[[str, datetime], None]
+StateKey = tuple[datetime, str] | None
+
+
+def _parse_temperature(value: Any) -> float | None:
+    """Return a temperature attribute as float, or None if it is not numeric."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _heating_reason(
+    state_value: str,
+    hvac_action: Any,
+    current_temperature: float | None,
+    target_temperature: float | None,
+) -> str | None:
+    """Return why a thermostat counts as heating from parsed temperatures."""
+    if hvac_action == "heating":
+        return "hvac_action"
+    if state_value != "heat" or current_temperature is None or target_temperature is None:
+        return None
+    return "below_target" if current_temperature < target_temperature else None
+
+
+def _temperature_weight(
+    current_temperature: float | None, target_temperature: float | None
+) -> float:
+    """Return the temperature weighting factor from parsed temperatures."""
+    if current_temperature is None or target_temperature is None:
+        return 1.0
+    delta = target_temperature - current_temperature
+    return max(0.5, min(3.0, 1.0 + max(delta, 0.0) * 0.25))
+
+
+def heating_reason(state_value: str, attributes: dict) -> str | None:
+    """Return why a thermostat counts as heating, or None if it does not."""
+    return _heating_reason(
+        state_value,
+        attributes.get("hvac_action"),
+        _parse_temperature(attributes.get("current_temperature")),
+        _parse_temperature(attributes.get("temperature")),
+    )
+
+
+def is_heating_active(state_value: str, attributes: dict) -> bool:
+    """Estimate whether a thermostat is currently heating."""
+    return heating_reason(state_value, attributes) is not None
+
+
+def temperature_weight(attributes: dict[str, Any]) -> float:
+    """Return a weighting factor derived from target/current temperature."""
+    return _temperature_weight(
+        _parse_temperature(attributes.get("current_temperature")),
+        _parse_temperature(attributes.get("temperature")),
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class HeaterState:
+    """Heating relevant part of a climate state.
+
+    The temperatures are parsed once per state and both the heating flag and
+    the temperature weight are derived from them.
+    """
+
+    heating: bool
+    temperature_weight: float
+    reason: str | None = None
+    hvac_action: str | None = None
+    current_temperature: float | None = None
+    target_temperature: float | None = None
+
+    @classmethod
+    def from_state(cls, state: State | None) -> HeaterState | None:
+        """Parse a climate state, returning None for a missing entity."""
+        if state is None:
+            return None
+        attributes = state.attributes
+        hvac_action = attributes.get("hvac_action")
+        current_temperature = _parse_temperature(attributes.get("current_temperature"))
+        target_temperature = _parse_temperature(attributes.get("temperature"))
+        reason = _heating_reason(
+            state.state, hvac_action, current_temperature, target_temperature
+        )
+        return cls(
+            heating=reason is not None,
+            temperature_weight=_temperature_weight(current_temperature, target_temperature),
+            reason=reason,
+            hvac_action=hvac_action,
+            current_temperature=current_temperature,
+            target_temperature=target_temperature,
+        )
+
+    def effort_rate(self, calculation_method: str) -> float:
+        """Return the unweighted effort per second for a calculation method."""
+        if not self.heating:
+            return 0.0
+
+        if calculation_method == "runtime_temp_weighted":
+            return self.temperature_weight
+
+        return 1.0
+
+    def valve_weight(self, calculation_method: str) -> float:
+        """Return the factor applied to the valve opening for a calculation method.
+
+        The valve opening replaces the heating flag, so the temperature weight
+        applies whether or not the thermostat reports heating.
+        """
+        if calculation_method == "runtime_temp_weighted":
+            return self.temperature_weight
+
+        return 1.0
+
+
+@dataclass(slots=True, frozen=True)
+class MeterReading:
+    """Numeric value of a gas meter state."""
+
+    value: float
+    unit: str | None
+    last_changed: datetime
+    last_updated: datetime
+
+    @classmethod
+    def from_state(cls, state: State | None) -> MeterReading | None:
+        """Parse a gas meter state, returning None if it is not numeric."""
+        if state is None:
+            return None
+
+        try:
+            value = float(state.state)
+        except (TypeError, ValueError):
+            return None
+
+        return cls(
+            value=value,
+            unit=state.attributes.get("unit_of_measurement"),
+            last_changed=state.last_changed,
+            last_updated=state.last_updated,
+        )
+
+
+def _state_key(state: State | None) -> StateKey:
+    """Return the cache key of a state, which changes with every state write."""
+    if state is None:
+        return None
+    return (state.last_updated, state.context.id)
+
+
+class StateHub:
+    """Domain wide subscription to heater and gas meter states.
+
+    Every entity is tracked once, however many config entries use it. States
+    are parsed at most once per change and cached for all coordinators, which
+    are notified with the entity id and the time of the change. A cached value
+    is keyed by the ``last_updated`` time and context of the state it was
+    parsed from and only used while they match the current state, so readers
+    never see a stale value before the change has been dispatched and old
+    state objects are not kept alive by the cache.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self._listeners: dict[str, list[StateListener]] = {}
+        self._unsubscribe: dict[str, CALLBACK_TYPE] = {}
+        self._heaters: dict[str, tuple[StateKey, HeaterState | None]] = {}
+        self._meters: dict[str, tuple[StateKey, MeterReading | None]] = {}
+
+    @callback
+    def async_subscribe(
+        self, entity_ids: Iterable[str], listener: StateListener
+    ) -> CALLBACK_TYPE:
+        """Call ``listener`` on state changes of the entities until unsubscribed."""
+        entity_ids = list(dict.fromkeys(entity_ids))
+        for entity_id in entity_ids:
+            listeners = self._listeners.setdefault(entity_id, [])
+            if not listeners:
+                self._unsubscribe[entity_id] = async_track_state_change_event(
+                    self.hass, entity_id, self._async_state_changed
+                )
+            listeners.append(listener)
+
+        @callback
+        def _async_unsubscribe() -> None:
+            for entity_id in entity_ids:
+                listeners = self._listeners[entity_id]
+                listeners.remove(listener)
+                if listeners:
+                    continue
+                del self._listeners[entity_id]
+                self._unsubscribe.pop(entity_id)()
+                self._heaters.pop(entity_id, None)
+                self._meters.pop(entity_id, None)
+
+        return _async_unsubscribe
+
+    @callback
+    def heater_state(self, entity_id: str) -> HeaterState | None:
+        """Return the parsed state of a heater."""
+        state = self.hass.states.get(entity_id)
+        key = _state_key(state)
+        cached = self._heaters.get(entity_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        heater_state = HeaterState.from_state(state)
+        if entity_id in self._listeners:
+            # Only tracked entities are cached, so the cache cannot grow unbounded.
+            self._heaters[entity_id] = (key, heater_state)
+        return heater_state
+
+    @callback
+    def meter_reading(self, entity_id: str) -> MeterReading | None:
+        """Return the parsed reading of a gas meter."""
+        state = self.hass.states.get(entity_id)
+        key = _state_key(state)
+        cached = self._meters.get(entity_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        reading = MeterReading.from_state(state)
+        if entity_id in self._listeners:
+            self._meters[entity_id] = (key, reading)
+        return reading
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Notify all listeners of the entity about a state change."""
+        entity_id = event.data["entity_id"]
+        new_state = event.data["new_state"]
+        self.async_notify(
+            entity_id, event.time_fired if new_state is None else new_state.last_updated
+        )
+
+    @callback
+    def async_notify(self, entity_id: str, when: datetime) -> None:
+        """Notify all listeners of an entity that its state changed at ``when``."""
+        for listener in list(self._listeners.get(entity_id, ())):
+            listener(entity_id, when)
+
+
+@callback
+def async_get_state_hub(hass: HomeAssistant) -> StateHub:
+    """Return the state hub shared by all config entries."""
+    if (hub := hass.data.get(DATA_STATE_HUB)) is None:
+        hub = hass.data[DATA_STATE_HUB] = StateHub(hass)
+    return hub
@@ -0,0 +1,95 @@
+"""Refresh timing and counters for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from collections import deque
+from time import perf_counter
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, INSTRUMENTATION_SAMPLES
+
+DATA_INSTRUMENTATION: HassKey[dict[str, Instrumentation]] = HassKey(
+    f"{DOMAIN}_instrumentation"
+)
+
+
+class Instrumentation:
+    """Low-overhead durations and counters of one config entry.
+
+    While disabled, ``start`` returns None and every other call returns right
+    away, so the instrumented code paths only pay for one attribute check.
+    Durations keep the last ``INSTRUMENTATION_SAMPLES`` samples per name for
+    percentiles.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.enabled = False
+        self.durations: dict[str, deque[float]] = {}
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+
+    def start(self) -> float | None:
+        """Return a start mark for ``stop``, or None while disabled."""
+        return perf_counter() if self.enabled else None
+
+    def stop(self, name: str, started: float | None) -> None:
+        """Record the duration since a start mark."""
+        if started is None:
+            return
+        samples = self.durations.get(name)
+        if samples is None:
+            samples = self.durations[name] = deque(maxlen=INSTRUMENTATION_SAMPLES)
+        samples.append(perf_counter() - started)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increase a counter."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        """Set a value describing the last refresh."""
+        if self.enabled:
+            self.gauges[name] = value
+
+    def duration_summary(self, name: str) -> dict[str, float | int] | None:
+        """Return count, last, p50, p95 and max of a duration in milliseconds."""
+        samples = self.durations.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            "count": len(ordered),
+            "last_ms": round(samples[-1] * 1000, 3),
+            "p50_ms": round(ordered[last // 2] * 1000, 3),
+            "p95_ms": round(ordered[round(last * 0.95)] * 1000, 3),
+            "max_ms": round(ordered[last] * 1000, 3),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        return {
+            "enabled": self.enabled,
+            "durations": {name: self.duration_summary(name) for name in self.durations},
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+
+@callback
+def async_get_instrumentation(hass: HomeAssistant, entry_id: str) -> Instrumentation:
+    """Return the metrics of a config entry, kept across reloads."""
+    metrics = hass.data.setdefault(DATA_INSTRUMENTATION, {})
+    if (instrumentation := metrics.get(entry_id)) is None:
+        instrumentation = metrics[entry_id] = Instrumentation()
+    return instrumentation
+
+
+@callback
+def async_remove_instrumentation(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop the metrics of a removed config entry."""
+    hass.data.get(DATA_INSTRUMENTATION, {}).pop(entry_id, None)
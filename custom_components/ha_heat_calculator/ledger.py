@@ -0,0 +1,129 @@
+"""In-memory history of gas distribution rounds for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import LEDGER_MAX_ROUNDS, LEDGER_MAX_VALUES
+
+
+class AllocationLedger:
+    """Bounded ring buffer of distribution rounds backed by flat arrays.
+
+    Every round stores its timestamp, the meter delta, the warm-water deduction
+    and one share per heater. Capacity is limited both in rounds and in stored
+    values, so installs with many heaters keep fewer rounds. The oldest rounds
+    are overwritten first.
+    """
+
+    def __init__(self, heaters: Sequence[str], capacity: int | None = None) -> None:
+        """Initialize an empty ledger for the given heaters."""
+        self.heaters = list(heaters)
+        self.size = len(self.heaters)
+        if capacity is None:
+            capacity = min(LEDGER_MAX_ROUNDS, LEDGER_MAX_VALUES // (self.size + 3))
+        self.capacity = max(1, capacity)
+        self._times = array("d", bytes(8 * self.capacity))
+        self._delta_gas = array("d", bytes(8 * self.capacity))
+        self._warm_water = array("d", bytes(8 * self.capacity))
+        self._shares = array("d", bytes(8 * self.capacity * self.size))
+        self._oldest = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored rounds."""
+        return self._count
+
+    def append(
+        self,
+        when: datetime,
+        delta_gas: float,
+        warm_water: float,
+        shares: Sequence[float],
+    ) -> None:
+        """Store one distribution round, replacing the oldest when full."""
+        timestamp = when.timestamp()
+        if self._count:
+            # Keep rounds sorted so range lookups can bisect.
+            timestamp = max(timestamp, self._times[self._slot(self._count - 1)])
+
+        if self._count < self.capacity:
+            slot = self._slot(self._count)
+            self._count += 1
+        else:
+            slot = self._oldest
+            self._oldest = (self._oldest + 1) % self.capacity
+
+        self._times[slot] = timestamp
+        self._delta_gas[slot] = delta_gas
+        self._warm_water[slot] = warm_water
+        offset = slot * self.size
+        if len(shares) == self.size:
+            self._shares[offset : offset + self.size] = array("d", shares)
+        else:
+            self._shares[offset : offset + self.size] = array("d", bytes(8 * self.size))
+
+    def summarize(self, start: datetime, end: datetime) -> dict[str, Any]:
+        """Return the summed allocation of all rounds between two timestamps."""
+        first, last = self._range(start, end)
+        heater_sums = [0.0] * self.size
+        delta_gas = 0.0
+        warm_water = 0.0
+        for position in range(first, last):
+            slot = self._slot(position)
+            delta_gas += self._delta_gas[slot]
+            warm_water += self._warm_water[slot]
+            offset = slot * self.size
+            for index in range(self.size):
+                heater_sums[index] += self._shares[offset + index]
+
+        return {
+            "rounds": last - first,
+            "delta_gas": delta_gas,
+            "warm_water": warm_water,
+            "heaters": dict(zip(self.heaters, heater_sums)),
+        }
+
+    def rounds(self, start: datetime, end: datetime) -> list[dict[str, Any]]:
+        """Return every stored round between two timestamps."""
+        first, last = self._range(start, end)
+        result = []
+        for position in range(first, last):
+            slot = self._slot(position)
+            offset = slot * self.size
+            result.append(
+                {
+                    "time": dt_util.utc_from_timestamp(self._times[slot]).isoformat(),
+                    "delta_gas": self._delta_gas[slot],
+                    "warm_water": self._warm_water[slot],
+                    "heaters": dict(
+                        zip(self.heaters, self._shares[offset : offset + self.size])
+                    ),
+                }
+            )
+        return result
+
+    def _slot(self, position: int) -> int:
+        """Return the array slot of the round at a chronological position."""
+        return (self._oldest + position) % self.capacity
+
+    def _range(self, start: datetime, end: datetime) -> tuple[int, int]:
+        """Return the chronological positions of rounds within a time range."""
+        return self._bisect(start.timestamp(), False), self._bisect(end.timestamp(), True)
+
+    def _bisect(self, timestamp: float, inclusive: bool) -> int:
+        """Return the first position after (or at) a timestamp."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            value = self._times[self._slot(middle)]
+            if value < timestamp or (inclusive and value == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
@@ -4,11 +4,10 @@ from __future__ import annotations
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfArea, UnitOfPower, UnitOfVolume
+from homeassistant.const import UnitOfArea, UnitOfPower
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     CONF_GAS_PRICE,
@@ -19,6 +18,7 @@ from .const import (
 )
 from .coordinator import HeatCalculatorCoordinator
 from .device import build_device_info
+from .entity import HeatCalculatorEntity
 
 
 async def async_setup_entry(
@@ -28,17 +28,10 @@ async def async_setup_entry(
 ) -> None:
     """Set up number entities from a config entry."""
     coordinator: HeatCalculatorCoordinator = hass.data[DOMAIN][entry.entry_id]
-    gas_state = hass.states.get(coordinator.gas_meter_entity_id)
-    gas_unit = None if gas_state is None else gas_state.attributes.get("unit_of_measurement")
-    if gas_unit == "m3":
-        gas_unit = UnitOfVolume.CUBIC_METERS
-    if gas_unit is None:
-        gas_unit = UnitOfVolume.CUBIC_METERS
-
     currency = hass.config.currency or "EUR"
     entities = [
         WarmWaterPercentNumber(coordinator, entry),
-        GasPriceNumber(coordinator, entry, gas_unit, currency),
+        GasPriceNumber(coordinator, entry, coordinator.gas_unit, currency),
     ]
     for heater_entity_id in coordinator.heaters:
         entities.append(HeaterAreaNumber(coordinator, entry, heater_entity_id))
@@ -47,9 +40,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class WarmWaterPercentNumber(
-    CoordinatorEntity[HeatCalculatorCoordinator], NumberEntity, RestoreEntity
-):
+class WarmWaterPercentNumber(HeatCalculatorEntity, NumberEntity, RestoreEntity):
     """Number entity to control warm water percentage."""
 
     _attr_has_entity_name = True
@@ -63,26 +54,9 @@ class WarmWaterPercentNumber(
     def __init__(self, coordinator: HeatCalculatorCoordinator, entry: ConfigEntry) -> None:
         """Initialize number."""
         super().__init__(coordinator)
-        self._entry = entry
         self._attr_unique_id = f"{entry.entry_id}_warm_water_percent"
         self._attr_device_info = build_device_info(entry)
 
-    async def async_added_to_hass(self) -> None:
-        """Restore the last stored value when options are missing."""
-        await super().async_added_to_hass()
-        if CONF_WARM_WATER_PERCENT in self._entry.options:
-            return
-        last_state = await self.async_get_last_state()
-        if last_state is None:
-            return
-        try:
-            value = float(last_state.state)
-        except (TypeError, ValueError):
-            return
-        await self.coordinator.async_update_options(
-            {CONF_WARM_WATER_PERCENT: round(value, 2)}
-        )
-
     @property
     def native_value(self) -> float:
         """Return configured warm water percentage."""
@@ -95,9 +69,7 @@ class WarmWaterPercentNumber(
         )
 
 
-class GasPriceNumber(
-    CoordinatorEntity[HeatCalculatorCoordinator], NumberEntity, RestoreEntity
-):
+class GasPriceNumber(HeatCalculatorEntity, NumberEntity, RestoreEntity):
     """Number entity to control the gas price per cubic meter."""
 
     _attr_has_entity_name = True
@@ -117,25 +89,10 @@ class GasPriceNumber(
     ) -> None:
         """Initialize number."""
         super().__init__(coordinator)
-        self._entry = entry
         self._attr_unique_id = f"{entry.entry_id}_gas_price"
         self._attr_device_info = build_device_info(entry)
         self._attr_native_unit_of_measurement = f"{currency}/{gas_unit}"
 
-    async def async_added_to_hass(self) -> None:
-        """Restore the last stored value when options are missing."""
-        await super().async_added_to_hass()
-        if CONF_GAS_PRICE in self._entry.options:
-            return
-        last_state = await self.async_get_last_state()
-        if last_state is None:
-            return
-        try:
-            value = float(last_state.state)
-        except (TypeError, ValueError):
-            return
-        await self.coordinator.async_update_options({CONF_GAS_PRICE: round(value, 4)})
-
     @property
     def native_value(self) -> float:
         """Return configured gas price."""
@@ -146,9 +103,7 @@ class GasPriceNumber(
         await self.coordinator.async_update_options({CONF_GAS_PRICE: round(float(value), 4)})
 
 
-class HeaterAreaNumber(
-    CoordinatorEntity[HeatCalculatorCoordinator], NumberEntity, RestoreEntity
-):
+class HeaterAreaNumber(HeatCalculatorEntity, NumberEntity, RestoreEntity):
     """Number entity to control the heated area per heater."""
 
     _attr_has_entity_name = True
@@ -167,31 +122,12 @@ class HeaterAreaNumber(
     ) -> None:
         """Initialize number."""
         super().__init__(coordinator)
-        self._entry = entry
         self._heater_entity_id = heater_entity_id
         self._attr_unique_id = f"{entry.entry_id}_{heater_entity_id}_heated_area"
         heater_name = heater_entity_id.split(".", maxsplit=1)[-1].replace("_", " ").title()
         self._attr_name = f"{heater_name} Heated Area"
         self._attr_device_info = build_device_info(entry)
 
-    async def async_added_to_hass(self) -> None:
-        """Restore the last stored value when options are missing."""
-        await super().async_added_to_hass()
-        if self._heater_entity_id in self.coordinator.heater_areas:
-            return
-        last_state = await self.async_get_last_state()
-        if last_state is None:
-            return
-        try:
-            value = float(last_state.state)
-        except (TypeError, ValueError):
-            return
-        if value <= 0:
-            return
-        updated = dict(self.coordinator.heater_areas)
-        updated[self._heater_entity_id] = round(value, 2)
-        await self.coordinator.async_update_options({CONF_HEATER_AREAS: updated})
-
     @property
     def native_value(self) -> float:
         """Return configured heated area."""
@@ -208,9 +144,7 @@ class HeaterAreaNumber(
         await self.coordinator.async_update_options({CONF_HEATER_AREAS: updated})
 
 
-class HeaterOutputNumber(
-    CoordinatorEntity[HeatCalculatorCoordinator], NumberEntity, RestoreEntity
-):
+class HeaterOutputNumber(HeatCalculatorEntity, NumberEntity, RestoreEntity):
     """Number entity to control heater output in watts."""
 
     _attr_has_entity_name = True
@@ -229,31 +163,12 @@ class HeaterOutputNumber(
     ) -> None:
         """Initialize number."""
         super().__init__(coordinator)
-        self._entry = entry
         self._heater_entity_id = heater_entity_id
         self._attr_unique_id = f"{entry.entry_id}_{heater_entity_id}_heater_output"
         heater_name = heater_entity_id.split(".", maxsplit=1)[-1].replace("_", " ").title()
         self._attr_name = f"{heater_name} Heater Output"
         self._attr_device_info = build_device_info(entry)
 
-    async def async_added_to_hass(self) -> None:
-        """Restore the last stored value when options are missing."""
-        await super().async_added_to_hass()
-        if self._heater_entity_id in self.coordinator.heater_outputs:
-            return
-        last_state = await self.async_get_last_state()
-        if last_state is None:
-            return
-        try:
-            value = float(last_state.state)
-        except (TypeError, ValueError):
-            return
-        if value <= 0:
-            return
-        updated = dict(self.coordinator.heater_outputs)
-        updated[self._heater_entity_id] = round(value, 1)
-        await self.coordinator.async_update_options({CONF_HEATER_OUTPUTS: updated})
-
     @property
     def native_value(self) -> float:
         """Return configured heater output."""
@@ -0,0 +1,32 @@
+"""Local billing periods for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+
+def period_start(when: datetime, period: str) -> datetime:
+    """Return the local start of the billing period containing ``when``."""
+    local = dt_util.as_local(when)
+    if period == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = dt_util.start_of_local_day(local)
+    if period == "day":
+        return day
+    if period == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def period_end(start: datetime, period: str) -> datetime:
+    """Return the local start of the billing period after the one at ``start``."""
+    if period == "hour":
+        return dt_util.as_local(dt_util.as_utc(start) + timedelta(hours=1))
+    if period == "day":
+        return dt_util.start_of_local_day(start.date() + timedelta(days=1))
+    if period == "month":
+        year, month = divmod(start.month, 12)
+        return start.replace(year=start.year + year, month=month + 1)
+    return start.replace(year=start.year + 1)
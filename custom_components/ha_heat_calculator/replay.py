@@ -0,0 +1,130 @@
+"""Replay of recorded history through the gas allocation logic."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from datetime import datetime
+
+from homeassistant.core import State
+
+from .allocation import AllocationCore
+from .effort import EffortIntegrator, RecordedEffortRates
+from .hub import MeterReading
+
+StateChange = tuple[datetime, str, State]
+RoundListener = Callable[[datetime, datetime, float, float, Sequence[float], float], None]
+
+
+class AllocationReplay:
+    """Allocate recorded gas meter deltas by recorded heater effort.
+
+    The replay owns its own allocation core and effort integrator, so it can
+    run in an executor without touching the live coordinator. Effort is closed
+    at every meter reading, so the effort window of the core always holds the
+    effort since the previous reading.
+
+    An ``on_round`` listener receives the previous and current reading time,
+    the meter delta, the warm-water share, the heater shares and the gas price
+    of every round. With a price entity, its recorded states set the price of
+    the following rounds and the fixed price applies while it has no valid
+    state. Heaters with a valve position entity are driven by its recorded
+    opening, scaled by ``valve_weight`` of their recorded climate state.
+    """
+
+    def __init__(
+        self,
+        heaters: Sequence[str],
+        weights: Iterable[float],
+        gas_meter_entity_id: str,
+        effort_rate: Callable[[State | None], float],
+        distributable_gas: Callable[[float], float],
+        gas_price: float = 0.0,
+        gas_price_entity_id: str | None = None,
+        heater_valves: Mapping[str, str] | None = None,
+        valve_weight: Callable[[State | None], float] | None = None,
+    ) -> None:
+        """Initialize the replay with a snapshot of the allocation settings."""
+        self.core = AllocationCore(heaters)
+        self.core.set_weights(weights)
+        self.gas_meter_entity_id = gas_meter_entity_id
+        self.gas_price_entity_id = gas_price_entity_id
+        self.gas_price = gas_price
+        self._fixed_gas_price = gas_price
+        self.warm_water_total_allocated = 0.0
+        self.rounds = 0
+        self.on_round: RoundListener | None = None
+        self._rates = RecordedEffortRates(
+            heaters, heater_valves or {}, effort_rate, valve_weight
+        )
+        self._distributable_gas = distributable_gas
+        self._effort = EffortIntegrator(self._credit_effort)
+        self._last_gas_value: float | None = None
+        self._last_gas_time: datetime | None = None
+
+    def run(self, changes: Iterable[StateChange]) -> AllocationReplay:
+        """Consume time ordered state changes of the heaters and the gas meter."""
+        for when, entity_id, state in changes:
+            self.state_changed(when, entity_id, state)
+        return self
+
+    def state_changed(self, when: datetime, entity_id: str, state: State) -> None:
+        """Consume one recorded state change, later than all previous ones."""
+        if entity_id == self.gas_meter_entity_id:
+            self.gas_reading(when, state)
+        elif entity_id == self.gas_price_entity_id:
+            reading = MeterReading.from_state(state)
+            self.gas_price = (
+                self._fixed_gas_price if reading is None else max(0.0, reading.value)
+            )
+        else:
+            for heater_entity_id, rate in self._rates.update(entity_id, state):
+                self._effort.set_rate(heater_entity_id, rate, when)
+
+    def gas_reading(self, when: datetime, state: State) -> None:
+        """Distribute the increase since the previous recorded meter reading."""
+        try:
+            current_gas = float(state.state)
+        except (TypeError, ValueError):
+            return
+
+        self._effort.close_segments(when)
+        if self._last_gas_value is None or current_gas < self._last_gas_value:
+            # Meter resets are handled by syncing the baseline to the new value.
+            self.core.reset_effort()
+            self._last_gas_value = current_gas
+            self._last_gas_time = when
+            return
+
+        delta = current_gas - self._last_gas_value
+        if delta <= 0:
+            return
+
+        distributable = self._distributable_gas(delta)
+        warm_water = max(delta - distributable, 0.0)
+        self.warm_water_total_allocated += warm_water
+        shares: Sequence[float] = ()
+        if distributable > 0:
+            shares = self.core.distribute(distributable, price=self.gas_price)
+        else:
+            self.core.reset_effort()
+        self.rounds += 1
+        if self.on_round is not None:
+            self.on_round(
+                self._last_gas_time, when, delta, warm_water, shares, self.gas_price
+            )
+        self._last_gas_value = current_gas
+        self._last_gas_time = when
+
+    def totals(self) -> dict[str, float]:
+        """Return the replayed gas total per heater."""
+        return {
+            entity_id: float(self.core.totals[index])
+            for entity_id, index in self.core.index.items()
+        }
+
+    def _credit_effort(
+        self, heater_entity_id: str, start: datetime, end: datetime, rate: float
+    ) -> None:
+        """Add a closed heating interval to the replay effort."""
+        index = self.core.index[heater_entity_id]
+        self.core.effort[index] += (end - start).total_seconds() * rate
@@ -6,11 +6,11 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import CALCULATION_METHODS, CONF_CALCULATION_METHOD, DOMAIN
 from .coordinator import HeatCalculatorCoordinator
 from .device import build_device_info
+from .entity import HeatCalculatorEntity
 
 
 async def async_setup_entry(
@@ -23,7 +23,7 @@ async def async_setup_entry(
     async_add_entities([CalculationMethodSelect(coordinator, entry)])
 
 
-class CalculationMethodSelect(CoordinatorEntity[HeatCalculatorCoordinator], SelectEntity):
+class CalculationMethodSelect(HeatCalculatorEntity, SelectEntity):
     """Select entity to choose the allocation method."""
 
     _attr_has_entity_name = True
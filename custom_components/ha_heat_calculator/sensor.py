@@ -2,17 +2,20 @@
 
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Any
+
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfVolume
+from homeassistant.const import MATCH_ALL, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import slugify
 
-from .const import DOMAIN
+from .const import DOMAIN, PERIOD_COUNTERS
 from .coordinator import HeatCalculatorCoordinator
 from .device import build_device_info
+from .entity import HeatCalculatorEntity
 
 
 async def async_setup_entry(
@@ -22,29 +25,28 @@ async def async_setup_entry(
 ) -> None:
     """Set up gas allocation sensors from a config entry."""
     coordinator: HeatCalculatorCoordinator = hass.data[DOMAIN][entry.entry_id]
-    gas_state = hass.states.get(coordinator.gas_meter_entity_id)
-    native_unit = None if gas_state is None else gas_state.attributes.get("unit_of_measurement")
-    if native_unit == "m3":
-        native_unit = UnitOfVolume.CUBIC_METERS
-    if native_unit is None:
-        native_unit = UnitOfVolume.CUBIC_METERS
-
+    native_unit = coordinator.gas_unit
     currency = hass.config.currency or "EUR"
     entities = []
     for heater_entity_id in coordinator.heaters:
         entities.append(HeaterGasShareSensor(coordinator, entry, heater_entity_id, native_unit))
         entities.append(HeaterGasCostSensor(coordinator, entry, heater_entity_id, currency))
+    for group in coordinator.groups.names:
+        entities.append(GroupGasShareSensor(coordinator, entry, group, native_unit))
+        entities.append(GroupGasCostSensor(coordinator, entry, group, currency))
     entities.append(WarmWaterGasShareSensor(coordinator, entry, native_unit))
+    entities.append(LastDistributionSensor(coordinator, entry))
+    if coordinator.instrumentation:
+        entities.append(RefreshDurationSensor(coordinator, entry))
     async_add_entities(entities)
 
 
-class HeaterGasShareSensor(
-    CoordinatorEntity[HeatCalculatorCoordinator], SensorEntity, RestoreEntity
-):
+class HeaterGasShareSensor(HeatCalculatorEntity, SensorEntity):
     """Gas share sensor for one heater entity."""
 
     _attr_has_entity_name = True
     _attr_icon = "mdi:fire"
+    _unrecorded_attributes = frozenset(PERIOD_COUNTERS)
 
     def __init__(
         self,
@@ -61,21 +63,8 @@ class HeaterGasShareSensor(
         self._attr_name = f"{heater_name} Gas Consumption"
         self._attr_native_unit_of_measurement = native_unit
         self._attr_device_info = build_device_info(entry)
-
-    async def async_added_to_hass(self) -> None:
-        """Restore the last stored allocation after restart."""
-        await super().async_added_to_hass()
-        last_state = await self.async_get_last_state()
-        if last_state is None:
-            return
-        try:
-            value = float(last_state.state)
-        except (TypeError, ValueError):
-            return
-        heater_stats = self.coordinator.data.get(self._heater_entity_id)
-        if heater_stats is None:
-            return
-        heater_stats.total_allocated = max(0.0, value)
+        self._static_attributes: dict[str, Any] = {}
+        self._static_attributes_version = -1
 
     @property
     def native_value(self) -> float:
@@ -85,33 +74,35 @@ class HeaterGasShareSensor(
     @property
     def extra_state_attributes(self) -> dict[str, str | float | None]:
         """Return additional metadata for transparency."""
+        if self._static_attributes_version != self.coordinator.config_version:
+            self._static_attributes = {
+                "heater_entity": self._heater_entity_id,
+                "gas_meter_entity": self.coordinator.gas_meter_entity_id,
+                "calculation_method": self.coordinator.calculation_method,
+                "heater_area": self.coordinator.heater_areas.get(self._heater_entity_id),
+                "heater_output_watt": self.coordinator.heater_outputs.get(
+                    self._heater_entity_id
+                ),
+            }
+            self._static_attributes_version = self.coordinator.config_version
+        heater_stats = self.coordinator.data[self._heater_entity_id]
         return {
-            "heater_entity": self._heater_entity_id,
-            "gas_meter_entity": self.coordinator.gas_meter_entity_id,
-            "calculation_method": self.coordinator.calculation_method,
-            "heater_area": self.coordinator.heater_areas.get(self._heater_entity_id),
-            "heater_output_watt": self.coordinator.heater_outputs.get(
-                self._heater_entity_id
-            ),
-            "effort_window": round(self.coordinator.data[self._heater_entity_id].effort_window, 3),
-            "last_delta_gas": round(self.coordinator.last_delta_gas, 6),
-            "last_distributable_gas": round(self.coordinator.last_distributable_gas, 6),
-            "last_warm_water_deducted": round(self.coordinator.last_warm_water_deducted, 6),
-            "last_distribution_time": None
-            if self.coordinator.last_distribution_time is None
-            else self.coordinator.last_distribution_time.isoformat(),
+            **self._static_attributes,
+            **{
+                counter: round(heater_stats.period_total(counter), 3)
+                for counter in PERIOD_COUNTERS
+            },
         }
 
 
-class HeaterGasCostSensor(
-    CoordinatorEntity[HeatCalculatorCoordinator], SensorEntity, RestoreEntity
-):
+class HeaterGasCostSensor(HeatCalculatorEntity, SensorEntity):
     """Cost sensor for one heater entity."""
 
     _attr_has_entity_name = True
     _attr_icon = "mdi:cash"
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_state_class = SensorStateClass.TOTAL
+    _unrecorded_attributes = frozenset(PERIOD_COUNTERS)
 
     def __init__(
         self,
@@ -129,39 +120,97 @@ class HeaterGasCostSensor(
         self._attr_native_unit_of_measurement = currency
         self._attr_device_info = build_device_info(entry)
 
-    async def async_added_to_hass(self) -> None:
-        """Restore the last stored cost value after restart."""
-        await super().async_added_to_hass()
-        last_state = await self.async_get_last_state()
-        if last_state is None:
-            return
-        try:
-            last_cost = float(last_state.state)
-        except (TypeError, ValueError):
-            return
-        heater_stats = self.coordinator.data.get(self._heater_entity_id)
-        if heater_stats is None:
-            return
-        if heater_stats.total_allocated > 0:
-            return
-        if self.coordinator.gas_price <= 0:
-            return
-        heater_stats.total_allocated = max(0.0, last_cost / self.coordinator.gas_price)
+    @property
+    def native_value(self) -> float:
+        """Return the gas cost accumulated at the price of every round."""
+        return round(self.coordinator.data[self._heater_entity_id].total_cost, 3)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, float]:
+        """Return the cost of the current day, month and year."""
+        heater_stats = self.coordinator.data[self._heater_entity_id]
+        return {
+            counter: round(heater_stats.period_cost(counter), 3)
+            for counter in PERIOD_COUNTERS
+        }
+
+
+class GroupGasShareSensor(HeatCalculatorEntity, SensorEntity):
+    """Gas share sensor for one group of heaters."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:home-group"
+
+    def __init__(
+        self,
+        coordinator: HeatCalculatorCoordinator,
+        entry: ConfigEntry,
+        group: str,
+        native_unit: str | None,
+    ) -> None:
+        """Initialize sensor."""
+        super().__init__(coordinator)
+        self._group = group
+        self._attr_unique_id = f"{entry.entry_id}_group_{slugify(group)}_allocated_gas"
+        self._attr_name = f"{group} Gas Consumption"
+        self._attr_native_unit_of_measurement = native_unit
+        self._attr_device_info = build_device_info(entry)
+        self._static_attributes: dict[str, Any] = {}
+        self._static_attributes_version = -1
 
     @property
     def native_value(self) -> float:
-        """Return the calculated gas cost."""
-        allocated = self.coordinator.data[self._heater_entity_id].total_allocated
-        return round(allocated * self.coordinator.gas_price, 3)
+        """Return the gas consumption allocated to all heaters of the group."""
+        return round(self.coordinator.groups.total(self._group), 3)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the parent group and the heaters of the group."""
+        if self._static_attributes_version != self.coordinator.config_version:
+            groups = self.coordinator.groups
+            self._static_attributes = {
+                "parent_group": groups.parents.get(self._group),
+                "heaters": groups.members.get(self._group, []),
+            }
+            self._static_attributes_version = self.coordinator.config_version
+        return self._static_attributes
+
 
+class GroupGasCostSensor(HeatCalculatorEntity, SensorEntity):
+    """Cost sensor for one group of heaters."""
 
-class WarmWaterGasShareSensor(
-    CoordinatorEntity[HeatCalculatorCoordinator], SensorEntity, RestoreEntity
-):
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:cash"
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+
+    def __init__(
+        self,
+        coordinator: HeatCalculatorCoordinator,
+        entry: ConfigEntry,
+        group: str,
+        currency: str,
+    ) -> None:
+        """Initialize cost sensor."""
+        super().__init__(coordinator)
+        self._group = group
+        self._attr_unique_id = f"{entry.entry_id}_group_{slugify(group)}_allocated_cost"
+        self._attr_name = f"{group} Gas Cost"
+        self._attr_native_unit_of_measurement = currency
+        self._attr_device_info = build_device_info(entry)
+
+    @property
+    def native_value(self) -> float:
+        """Return the gas cost accumulated for all heaters of the group."""
+        return round(self.coordinator.groups.cost(self._group), 3)
+
+
+class WarmWaterGasShareSensor(HeatCalculatorEntity, SensorEntity):
     """Gas share sensor for warm water consumption."""
 
     _attr_has_entity_name = True
     _attr_icon = "mdi:water-boiler"
+    _unrecorded_attributes = frozenset(PERIOD_COUNTERS)
 
     def __init__(
         self,
@@ -175,19 +224,8 @@ class WarmWaterGasShareSensor(
         self._attr_name = "Warm Water Gas Consumption"
         self._attr_native_unit_of_measurement = native_unit
         self._attr_device_info = build_device_info(entry)
-
-    async def async_added_to_hass(self) -> None:
-        """Restore the last stored allocation after restart."""
-        await super().async_added_to_hass()
-        last_state = await self.async_get_last_state()
-        if last_state is None:
-            return
-        try:
-            value = float(last_state.state)
-        except (TypeError, ValueError):
-            return
-        if self.coordinator.warm_water_total_allocated <= 0:
-            self.coordinator.warm_water_total_allocated = max(0.0, value)
+        self._static_attributes: dict[str, Any] = {}
+        self._static_attributes_version = -1
 
     @property
     def native_value(self) -> float:
@@ -197,12 +235,81 @@ class WarmWaterGasShareSensor(
     @property
     def extra_state_attributes(self) -> dict[str, str | float | None]:
         """Return additional metadata for transparency."""
+        if self._static_attributes_version != self.coordinator.config_version:
+            self._static_attributes = {
+                "gas_meter_entity": self.coordinator.gas_meter_entity_id,
+                "include_warm_water": self.coordinator.include_warm_water,
+                "warm_water_percent": self.coordinator.warm_water_percent,
+            }
+            self._static_attributes_version = self.coordinator.config_version
+        return {
+            **self._static_attributes,
+            **{
+                counter: round(value, 3)
+                for counter, value in self.coordinator.warm_water_periods.items()
+            },
+        }
+
+
+class LastDistributionSensor(HeatCalculatorEntity, SensorEntity):
+    """Diagnostic sensor with the metadata of the last distribution round."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Last Distribution"
+    _attr_icon = "mdi:chart-pie"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: HeatCalculatorCoordinator, entry: ConfigEntry) -> None:
+        """Initialize sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry.entry_id}_last_distribution"
+        self._attr_device_info = build_device_info(entry)
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return the time of the last distribution round."""
+        return self.coordinator.last_distribution_time
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | float | None]:
+        """Return the gas amounts of the last distribution round."""
         return {
             "gas_meter_entity": self.coordinator.gas_meter_entity_id,
-            "include_warm_water": self.coordinator.include_warm_water,
-            "warm_water_percent": self.coordinator.warm_water_percent,
+            "last_delta_gas": round(self.coordinator.last_delta_gas, 6),
+            "last_distributable_gas": round(self.coordinator.last_distributable_gas, 6),
             "last_warm_water_deducted": round(self.coordinator.last_warm_water_deducted, 6),
-            "last_distribution_time": None
-            if self.coordinator.last_distribution_time is None
-            else self.coordinator.last_distribution_time.isoformat(),
+            "last_gas_price": self.coordinator.last_gas_price,
         }
+
+
+class RefreshDurationSensor(HeatCalculatorEntity, SensorEntity):
+    """Diagnostic sensor with the duration of the last refresh."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Refresh Duration"
+    _attr_icon = "mdi:timer-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 2
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator: HeatCalculatorCoordinator, entry: ConfigEntry) -> None:
+        """Initialize sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry.entry_id}_refresh_duration"
+        self._attr_device_info = build_device_info(entry)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the duration of the last refresh in milliseconds."""
+        summary = self.coordinator.metrics.duration_summary("refresh")
+        return None if summary is None else summary["last_ms"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return duration percentiles, counters and gauges."""
+        metrics = self.coordinator.metrics.as_dict()
+        return {**metrics["durations"], **metrics["counters"], **metrics["gauges"]}
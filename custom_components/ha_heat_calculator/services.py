@@ -0,0 +1,204 @@
+"""Services for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_HEATER_AREAS,
+    CONF_HEATER_OUTPUTS,
+    CONF_INCLUDE_WARM_WATER,
+    CONF_WARM_WATER_PERCENT,
+    DOMAIN,
+)
+from .coordinator import (
+    MAX_WARM_WATER_PERCENT,
+    MIN_WARM_WATER_PERCENT,
+    HeatCalculatorCoordinator,
+)
+from .export import EXPORT_PERIODS
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_PER_ROUND = "per_round"
+ATTR_HEATERS = "heaters"
+ATTR_PERIOD = "period"
+ATTR_FILENAME = "filename"
+
+SERVICE_BACKFILL = "backfill"
+SERVICE_QUERY_ROUNDS = "query_rounds"
+SERVICE_SIMULATE = "simulate"
+SERVICE_EXPORT = "export"
+
+CANDIDATE_FIELDS = (
+    CONF_HEATER_AREAS,
+    CONF_HEATER_OUTPUTS,
+    CONF_INCLUDE_WARM_WATER,
+    CONF_WARM_WATER_PERCENT,
+)
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+QUERY_ROUNDS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_PER_ROUND, default=False): cv.boolean,
+    }
+)
+
+HEATER_FACTORS_SCHEMA = vol.Schema(
+    {cv.entity_id: vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))}
+)
+
+SIMULATE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(CONF_HEATER_AREAS): HEATER_FACTORS_SCHEMA,
+        vol.Optional(CONF_HEATER_OUTPUTS): HEATER_FACTORS_SCHEMA,
+        vol.Optional(CONF_INCLUDE_WARM_WATER): cv.boolean,
+        vol.Optional(CONF_WARM_WATER_PERCENT): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=MIN_WARM_WATER_PERCENT, max=MAX_WARM_WATER_PERCENT),
+        ),
+    }
+)
+
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_HEATERS, default=[]): cv.entity_ids,
+        vol.Optional(ATTR_PERIOD, default="day"): vol.In(EXPORT_PERIODS),
+        vol.Optional(ATTR_FILENAME): vol.All(cv.string, vol.Match(r"^[\w.-]+\.csv$")),
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant, entry_id: str) -> HeatCalculatorCoordinator:
+    """Return the coordinator of a loaded config entry."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+    if coordinator is None:
+        raise ServiceValidationError(f"Config entry {entry_id} is not loaded")
+    return coordinator
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Interpret naive service datetimes in the configured time zone."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_utc(value)
+
+
+def _get_range(call: ServiceCall) -> tuple[datetime, datetime]:
+    """Return the validated UTC time range of a service call."""
+    now = dt_util.utcnow()
+    start = _as_utc(call.data[ATTR_START])
+    end = now if ATTR_END not in call.data else min(_as_utc(call.data[ATTR_END]), now)
+    if start >= end:
+        raise ServiceValidationError("The start must be before the end and in the past")
+    return start, end
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _async_backfill(call: ServiceCall) -> ServiceResponse:
+        """Recalculate allocations of a config entry from recorder history."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        start, end = _get_range(call)
+        return await coordinator.async_backfill(start, end)
+
+    @callback
+    def _async_query_rounds(call: ServiceCall) -> ServiceResponse:
+        """Return the distribution rounds of a config entry kept in memory."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        start, end = _get_range(call)
+        response = coordinator.rounds.summarize(start, end)
+        if call.data[ATTR_PER_ROUND]:
+            response["per_round"] = coordinator.rounds.rounds(start, end)
+        return response
+
+    async def _async_simulate(call: ServiceCall) -> ServiceResponse:
+        """Compare calculation methods and candidate settings over recorded history."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        start, end = _get_range(call)
+        candidate = {key: call.data[key] for key in CANDIDATE_FIELDS if key in call.data}
+        return await coordinator.async_simulate(start, end, candidate)
+
+    async def _async_export(call: ServiceCall) -> ServiceResponse:
+        """Write per-heater consumption and cost per billing period to a CSV file."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        start, end = _get_range(call)
+        heaters = call.data[ATTR_HEATERS]
+        if unknown := set(heaters) - set(coordinator.heaters):
+            raise ServiceValidationError(
+                f"Not configured heaters: {', '.join(sorted(unknown))}"
+            )
+        filename = call.data.get(ATTR_FILENAME) or (
+            f"{coordinator.config_entry.entry_id}_{dt_util.as_local(start):%Y%m%d}"
+            f"_{dt_util.as_local(end):%Y%m%d}.csv"
+        )
+        path = Path(hass.config.path(DOMAIN, filename))
+        return await coordinator.async_export(
+            start, end, path, heaters, call.data[ATTR_PERIOD]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL,
+        _async_backfill,
+        schema=BACKFILL_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_ROUNDS,
+        _async_query_rounds,
+        schema=QUERY_ROUNDS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SIMULATE,
+        _async_simulate,
+        schema=SIMULATE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        _async_export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
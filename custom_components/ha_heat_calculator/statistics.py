@@ -0,0 +1,267 @@
+"""Long-term statistics export for HA Heat Calculator."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .history import recorder_available
+
+
+def heater_statistic_id(entry_id: str, heater_entity_id: str) -> str:
+    """Return the external statistic id of a heater's allocated gas."""
+    object_id = heater_entity_id.split(".", maxsplit=1)[-1]
+    return f"{DOMAIN}:{slugify(f'{entry_id}_{object_id}_gas')}"
+
+
+def warm_water_statistic_id(entry_id: str) -> str:
+    """Return the external statistic id of the warm-water gas share."""
+    return f"{DOMAIN}:{slugify(f'{entry_id}_warm_water_gas')}"
+
+
+def _statistic_metadata(name: str, statistic_id: str, unit: str | None) -> dict[str, Any]:
+    """Return the metadata of a summed statistic for the running core.
+
+    Newer cores describe the mean with ``mean_type`` and the unit with
+    ``unit_class``; older cores only know ``has_mean``.
+    """
+    from homeassistant.components.recorder.models import StatisticMetaData
+    from homeassistant.components.recorder.statistics import (
+        STATISTIC_UNIT_TO_UNIT_CONVERTER,
+    )
+
+    metadata = StatisticMetaData(
+        has_sum=True,
+        name=name,
+        source=DOMAIN,
+        statistic_id=statistic_id,
+        unit_of_measurement=unit,
+    )
+    try:
+        from homeassistant.components.recorder.models import StatisticMeanType
+    except ImportError:
+        metadata["has_mean"] = False
+    else:
+        metadata["mean_type"] = StatisticMeanType.NONE
+    if "unit_class" in StatisticMetaData.__annotations__:
+        converter = STATISTIC_UNIT_TO_UNIT_CONVERTER.get(unit)
+        metadata["unit_class"] = None if converter is None else converter.UNIT_CLASS
+    return metadata
+
+
+class AllocationStatistics:
+    """Collect allocation deltas per hour and import them as external statistics.
+
+    Deltas are summed per statistic and hour. Completed hours are imported in
+    one recorder job per statistic, so long-term graphs come from compact
+    hourly rows instead of the sensors' state history. The running sums of
+    completed hours are part of the persisted ledger.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, title: str) -> None:
+        """Initialize the exporter."""
+        self.hass = hass
+        self.sums: dict[str, float] = {}
+        self._entry_id = entry_id
+        self._title = title
+        self._warm_water_statistic_id = warm_water_statistic_id(entry_id)
+        self._names: dict[str, str] = {}
+        self._heater_statistic_ids: dict[str, str] = {}
+        self._pending: dict[str, dict[datetime, float]] = {}
+
+    def set_heaters(self, heaters: list[str]) -> None:
+        """Register the statistics of the configured heaters and the warm water.
+
+        Slugifying is expensive, so ids and names are built once per
+        configuration. Pending hours of heaters that are no longer configured
+        are dropped, as they could never be imported under a name.
+        """
+        self._heater_statistic_ids = {}
+        self._names = {
+            self._warm_water_statistic_id: f"{self._title} Warm Water Gas Consumption"
+        }
+        for heater_entity_id in heaters:
+            statistic_id = heater_statistic_id(self._entry_id, heater_entity_id)
+            heater_name = heater_entity_id.split(".", maxsplit=1)[-1].replace("_", " ").title()
+            self._heater_statistic_ids[heater_entity_id] = statistic_id
+            self._names[statistic_id] = f"{self._title} {heater_name} Gas Consumption"
+        self._pending = {
+            statistic_id: hours
+            for statistic_id, hours in self._pending.items()
+            if statistic_id in self._names
+        }
+
+    def record(
+        self, when: datetime, shares: dict[str, float], warm_water_delta: float
+    ) -> None:
+        """Add the gas allocated in one round to the hour of ``when``.
+
+        Without a recorder nothing is collected, since nothing could be imported.
+        """
+        if not recorder_available(self.hass):
+            return
+        hour = dt_util.as_utc(when).replace(minute=0, second=0, microsecond=0)
+        for heater_entity_id, share in shares.items():
+            self._add(self._heater_statistic_ids[heater_entity_id], hour, share)
+        self._add(self._warm_water_statistic_id, hour, warm_water_delta)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the running sums and pending hours in their storage format."""
+        return {
+            "sums": dict(self.sums),
+            "pending": {
+                statistic_id: {hour.isoformat(): delta for hour, delta in hours.items()}
+                for statistic_id, hours in self._pending.items()
+            },
+        }
+
+    def load(self, stored: dict[str, Any]) -> None:
+        """Restore running sums and pending hours from the ledger.
+
+        Pending hours of statistics that are not registered are skipped.
+        """
+        self.sums = {
+            statistic_id: float(value)
+            for statistic_id, value in stored.get("sums", {}).items()
+        }
+        for statistic_id, hours in stored.get("pending", {}).items():
+            if statistic_id not in self._names:
+                continue
+            for hour, delta in hours.items():
+                parsed = dt_util.parse_datetime(hour)
+                if parsed is not None:
+                    self._add(statistic_id, parsed, float(delta))
+
+    def _add(self, statistic_id: str, hour: datetime, delta: float) -> None:
+        """Accumulate a delta for one statistic and hour."""
+        hours = self._pending.setdefault(statistic_id, {})
+        hours[hour] = hours.get(hour, 0.0) + delta
+
+    @callback
+    def async_flush(self, unit: str | None, include_current_hour: bool = False) -> bool:
+        """Import completed hours and return whether any hour was completed.
+
+        With ``include_current_hour`` the running hour is imported as well; it
+        stays pending and is imported again with its final value later.
+        """
+        if not recorder_available(self.hass):
+            # Hours restored from the ledger can never be imported without a recorder.
+            self._pending = {}
+            return False
+        if not self._pending:
+            return False
+
+        from homeassistant.components.recorder.models import StatisticData
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        current_hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        completed = False
+        for statistic_id, hours in self._pending.items():
+            rows: list[StatisticData] = []
+            running_sum = self.sums.get(statistic_id, 0.0)
+            for hour in sorted(hours):
+                if hour >= current_hour and not include_current_hour:
+                    break
+                running_sum += hours[hour]
+                rows.append(StatisticData(start=hour, state=running_sum, sum=running_sum))
+                if hour < current_hour:
+                    self.sums[statistic_id] = running_sum
+                    del hours[hour]
+                    completed = True
+            if not rows:
+                continue
+            async_add_external_statistics(
+                self.hass, _statistic_metadata(self._names[statistic_id], statistic_id, unit), rows
+            )
+
+        self._pending = {
+            statistic_id: hours for statistic_id, hours in self._pending.items() if hours
+        }
+        return completed
+
+    async def async_replace(
+        self,
+        unit: str | None,
+        start: datetime,
+        end: datetime,
+        heater_hours: dict[str, dict[datetime, float]],
+        warm_water_hours: dict[datetime, float],
+    ) -> tuple[dict[str, dict[datetime, float]], dict[datetime, float]]:
+        """Replace the imported hours from ``start`` to ``end`` and return the old ones.
+
+        Completed hours are imported first, so the recorder holds every
+        allocated hour of the range. The hours of the range are rewritten with
+        the given gas per heater and hour and of the warm water, and the sums
+        of all later hours are shifted by the difference, so the statistics
+        stay continuous. Must not run concurrently with ``async_flush``.
+        """
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.models import StatisticData
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+            statistics_during_period,
+        )
+
+        self.async_flush(unit)
+        instance = get_instance(self.hass)
+        await instance.async_block_till_done()
+        recorded = await instance.async_add_executor_job(
+            statistics_during_period,
+            self.hass,
+            start,
+            None,
+            set(self._names),
+            "hour",
+            None,
+            {"change", "sum"},
+        )
+
+        new_hours = {
+            self._heater_statistic_ids[heater_entity_id]: hours
+            for heater_entity_id, hours in heater_hours.items()
+        }
+        new_hours[self._warm_water_statistic_id] = warm_water_hours
+        old_hours: dict[str, dict[datetime, float]] = {}
+        for statistic_id, name in self._names.items():
+            recorded_rows = recorded.get(statistic_id, [])
+            changes = {
+                dt_util.utc_from_timestamp(row["start"]): row["change"] or 0.0
+                for row in recorded_rows
+            }
+            hours = new_hours.get(statistic_id, {})
+            old_hours[statistic_id] = {
+                hour: change for hour, change in changes.items() if hour < end
+            }
+            if recorded_rows:
+                first = recorded_rows[0]
+                running_sum = (first["sum"] or 0.0) - (first["change"] or 0.0)
+            else:
+                running_sum = self.sums.get(statistic_id, 0.0)
+            rows: list[StatisticData] = []
+            for hour in sorted(changes.keys() | hours.keys()):
+                running_sum += hours.get(hour, 0.0) if hour < end else changes[hour]
+                rows.append(StatisticData(start=hour, state=running_sum, sum=running_sum))
+            if not rows:
+                continue
+            self.sums[statistic_id] = (
+                self.sums.get(statistic_id, 0.0)
+                + sum(hours.values())
+                - sum(old_hours[statistic_id].values())
+            )
+            async_add_external_statistics(
+                self.hass, _statistic_metadata(name, statistic_id, unit), rows
+            )
+
+        return (
+            {
+                heater_entity_id: old_hours[statistic_id]
+                for heater_entity_id, statistic_id in self._heater_statistic_ids.items()
+            },
+            old_hours[self._warm_water_statistic_id],
+        )
@@ -6,11 +6,11 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import CONF_INCLUDE_WARM_WATER, DOMAIN
 from .coordinator import HeatCalculatorCoordinator
 from .device import build_device_info
+from .entity import HeatCalculatorEntity
 
 
 async def async_setup_entry(
@@ -23,7 +23,7 @@ async def async_setup_entry(
     async_add_entities([IncludeWarmWaterSwitch(coordinator, entry)])
 
 
-class IncludeWarmWaterSwitch(CoordinatorEntity[HeatCalculatorCoordinator], SwitchEntity):
+class IncludeWarmWaterSwitch(HeatCalculatorEntity, SwitchEntity):
     """Switch to include or exclude warm water consumption."""
 
     _attr_has_entity_name = True
@@ -0,0 +1,161 @@
+"""Tests for the array-backed allocation core.
+
+The allocation module has no Home Assistant imports and is loaded straight
+from its file, like in the allocation benchmark, so the tests also run
+without a Home Assistant installation.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "custom_components"
+    / "ha_heat_calculator"
+    / "allocation.py"
+)
+HEATERS = ["climate.kitchen", "climate.bath", "climate.office"]
+PERIODS = ("daily", "monthly")
+
+
+def _load_allocation():
+    """Import the allocation module without importing the integration package."""
+    spec = importlib.util.spec_from_file_location("heat_calculator_allocation", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+allocation = _load_allocation()
+
+BACKENDS = [
+    False,
+    pytest.param(
+        True,
+        marks=pytest.mark.skipif(allocation.np is None, reason="NumPy is not installed"),
+    ),
+]
+
+
+@pytest.fixture(params=BACKENDS, ids=["array", "numpy"])
+def core(request):
+    """Return a core with equal weights, one priced round and all counters started."""
+    core = allocation.AllocationCore(HEATERS, PERIODS, use_numpy=request.param)
+    core.distribute(3.0, [1.0, 1.0, 1.0], price=2.0)
+    return core
+
+
+def test_numpy_threshold() -> None:
+    """Only larger cores use NumPy by default."""
+    small = allocation.AllocationCore(HEATERS)
+    large = allocation.AllocationCore(
+        [f"climate.heater_{index}" for index in range(allocation.NUMPY_MIN_HEATERS)]
+    )
+
+    assert not small.use_numpy
+    assert large.use_numpy is (allocation.np is not None)
+
+
+def test_distribute_prices_rounds_at_their_price(core) -> None:
+    """Every round is priced at the price in effect when it was distributed."""
+    core.distribute(3.0, [1.0, 2.0, 0.0], price=3.0)
+
+    assert list(core.totals) == pytest.approx([2.0, 3.0, 1.0])
+    assert list(core.costs) == pytest.approx([5.0, 8.0, 2.0])
+    assert core.period_total("daily", 1) == pytest.approx(3.0)
+    assert core.period_cost("daily", 1) == pytest.approx(8.0)
+
+
+def test_set_price_keeps_costs_of_allocated_gas(core) -> None:
+    """A price change only applies to the gas of the following rounds."""
+    core.set_price(5.0)
+
+    assert core.cost(0) == pytest.approx(2.0)
+    core.distribute(3.0, [1.0, 0.0, 0.0], price=5.0)
+    assert core.cost(0) == pytest.approx(17.0)
+    assert core.cost(1) == pytest.approx(2.0)
+    assert core.period_cost("monthly", 0) == pytest.approx(17.0)
+
+
+def test_set_total_keeps_cost_and_period_counters(core) -> None:
+    """Setting a total does not price or count the difference."""
+    core.reset_period("daily")
+    core.set_total(0, 10.0)
+
+    assert core.totals[0] == pytest.approx(10.0)
+    assert core.cost(0) == pytest.approx(2.0)
+    assert core.period_total("daily", 0) == pytest.approx(0.0)
+    assert core.period_total("monthly", 0) == pytest.approx(1.0)
+    core.distribute(3.0, [1.0, 1.0, 1.0], price=2.0)
+    assert core.totals[0] == pytest.approx(11.0)
+    assert core.cost(0) == pytest.approx(4.0)
+    assert core.period_total("daily", 0) == pytest.approx(1.0)
+
+
+def test_set_cost_keeps_period_costs(core) -> None:
+    """Setting a cost leaves the period costs as they are."""
+    core.set_cost(2, 7.0)
+
+    assert core.cost(2) == pytest.approx(7.0)
+    assert core.period_cost("daily", 2) == pytest.approx(2.0)
+
+
+def test_reset_period_starts_one_counter_from_zero(core) -> None:
+    """Resetting a period clears its counters and leaves the others counting."""
+    core.reset_period("daily")
+
+    assert core.period_total("daily", 0) == pytest.approx(0.0)
+    assert core.period_cost("daily", 0) == pytest.approx(0.0)
+    assert core.period_total("monthly", 0) == pytest.approx(1.0)
+    core.distribute(6.0, [0.0, 0.0, 1.0], price=1.0)
+    assert core.period_total("daily", 2) == pytest.approx(6.0)
+    assert core.period_cost("daily", 2) == pytest.approx(6.0)
+    assert core.period_total("monthly", 2) == pytest.approx(7.0)
+    assert core.period_cost("monthly", 2) == pytest.approx(8.0)
+
+
+def test_set_period_total_and_cost(core) -> None:
+    """Period counters can be restored without changing the lifetime values."""
+    core.set_period_total("daily", 1, 0.25)
+    core.set_period_cost("daily", 1, 0.5)
+
+    assert core.period_total("daily", 1) == pytest.approx(0.25)
+    assert core.period_cost("daily", 1) == pytest.approx(0.5)
+    assert core.totals[1] == pytest.approx(1.0)
+    assert core.cost(1) == pytest.approx(2.0)
+
+
+def test_copy_from_carries_state_of_kept_heaters(core) -> None:
+    """A reconfigured core keeps effort, totals, costs and counters by heater."""
+    core.reset_period("daily")
+    core.distribute(3.0, [0.0, 1.0, 0.0], price=4.0)
+    core.effort[1] = 0.5
+
+    copy = allocation.AllocationCore(
+        ["climate.bath", "climate.hall", "climate.kitchen"], PERIODS, use_numpy=False
+    )
+    copy.copy_from(core)
+
+    assert copy.price == core.price
+    assert list(copy.effort) == pytest.approx([0.5, 0.0, 0.0])
+    assert list(copy.totals) == pytest.approx([4.0, 0.0, 1.0])
+    assert list(copy.costs) == pytest.approx([14.0, 0.0, 2.0])
+    assert copy.period_total("daily", 0) == pytest.approx(3.0)
+    assert copy.period_cost("daily", 0) == pytest.approx(12.0)
+    assert copy.period_total("monthly", 2) == pytest.approx(1.0)
+    assert copy.period_cost("monthly", 2) == pytest.approx(2.0)
+
+
+def test_heater_stats_view(core) -> None:
+    """The per-heater view reads and writes through to the core."""
+    stats = allocation.HeaterStats(core, 1)
+    stats.total_allocated = 4.0
+    stats.set_period_total("daily", 2.0)
+
+    assert core.totals[1] == pytest.approx(4.0)
+    assert stats.period_total("daily") == pytest.approx(2.0)
+    assert stats.period_total("monthly") == pytest.approx(1.0)